@@ -1,16 +1,22 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime, time, timedelta
 import uuid
-import pytz
 import holidays
 from streamlit_calendar import calendar
+from streamlit.errors import StreamlitAPIException
 import time as tm
 import io
-from PIL import Image
 import base64
+from leave import calculate_leave_usage
+from storage import (
+    KST, JANGAN_FOREMEN, JANGAN_MID, ULSAN_APPROVERS, COMPANIES, VERSION_POLL_SEC,
+    get_today, get_sheet_versions, refresh_sheet_versions, load_user_db, upsert_manager, delete_manager,
+    verify_password, is_legacy_password, load_thumbnails, load_full_image,
+    load_data, save_notice, save_suggestion, save_attendance, save_schedule,
+    update_attendance_step, apply_sheet_edits,
+    get_leave_index,
+)
 
 # =========================================================
 # [설정] 페이지 기본 설정
@@ -23,7 +29,6 @@ st.set_page_config(
 )
 
 main_container = st.empty()
-KST = pytz.timezone('Asia/Seoul')
 
 # =========================================================
 # [스타일] CSS
@@ -158,83 +163,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# =========================================================
-# [설정] 관리자 및 회사 정보
-# =========================================================
-JANGAN_FOREMEN = ["승인 담당자를 선택 해주세요.", "JK 조장", "JX 메인 조장", "JX 어퍼 조장", "MX5 조장", "피더 조장"]
-JANGAN_MID = ["반장"]
-ULSAN_APPROVERS = ["승인 담당자를 선택 해주세요.", "김범진", "남수영", "홍성곤"]
-ALL_MANAGERS = JANGAN_FOREMEN + JANGAN_MID + ULSAN_APPROVERS + ["MASTER"]
-
-COMPANIES = {
-    "9424": "장안 제이유",
-    "0645": "울산 제이유"
-}
-
-# =========================================================
-# [함수] 데이터 처리
-# =========================================================
-def get_client():
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds_dict = st.secrets["gcp_service_account"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    return client
-
-def get_worksheet(sheet_name):
-    client = get_client()
-    return client.open("사내공지사항DB").worksheet(sheet_name)
-
-def get_today():
-    return datetime.now(KST).strftime("%Y-%m-%d")
-
-def load_user_db():
-    try:
-        sheet = get_worksheet("관리자DB")
-        data = sheet.get_all_records()
-        return {str(row['이름']).strip(): str(row['비밀번호']).strip() for row in data}
-    except: return {}
-
-def save_user_db(db):
-    try:
-        sheet = get_worksheet("관리자DB")
-        sheet.clear()
-        sheet.append_row(["이름", "비밀번호"])
-        for name, pw in db.items():
-            sheet.append_row([name, str(pw)])
-    except Exception as e: st.error(f"저장 오류: {e}")
-
-# [이미지 처리 함수]
-def image_to_base64(image_file):
-    if image_file is None:
-        return ""
-    try:
-        img = Image.open(image_file)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        max_width = 400
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((max_width, new_height))
-        
-        buffered = io.BytesIO()
-        img.save(buffered, format="JPEG", quality=50) 
-        
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        
-        if len(img_str) > 49000:
-            img = img.resize((int(img.width * 0.7), int(img.height * 0.7)))
-            buffered = io.BytesIO()
-            img.save(buffered, format="JPEG", quality=40)
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-        return img_str
-    except Exception as e:
-        st.error(f"이미지 처리 오류: {e}")
-        return ""
-
 def format_multiline(text):
     if not text:
         return ""
@@ -264,116 +192,6 @@ def ui_time_selector(label_text, key_prefix, default_h=8, default_m=0):
         
     return time(int(sel_h), int(sel_m))
 
-@st.cache_data(ttl=300)
-def load_data(sheet_name, company_name):
-    try:
-        sheet = get_worksheet(sheet_name)
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-        
-        required_cols = {
-            "근태신청": ['소속', '신청일', '이름', '구분', '날짜및시간', '사유', '상태', '비밀번호', '승인담당자', '반려사유'],
-            "공지사항": ['소속', '작성일', '제목', '내용', '중요', '이미지데이터'], 
-            "건의사항": ['소속', '작성일', '제목', '내용', '작성자', '비공개', '비밀번호'],
-            "일정관리": ['소속', '날짜', '제목', '내용', '작성자']
-        }
-        if df.empty and sheet_name in required_cols: 
-            df = pd.DataFrame(columns=required_cols[sheet_name])
-            
-        if sheet_name in required_cols:
-            for col in required_cols[sheet_name]:
-                if col not in df.columns: df[col] = ""
-                
-        df = df.astype(str)
-        for col in df.columns:
-            if df[col].dtype == object: df[col] = df[col].str.strip()
-
-        if '소속' in df.columns:
-            df = df[df['소속'] == company_name.strip()]
-        return df
-    except: return pd.DataFrame()
-
-def save_notice(company, title, content, is_important, image_file=None):
-    sheet = get_worksheet("공지사항")
-    img_data = image_to_base64(image_file)
-    sheet.append_row([company, get_today(), title, content, "TRUE" if is_important else "FALSE", img_data])
-    st.cache_data.clear()
-
-def save_suggestion(company, title, content, author, is_private, password):
-    sheet = get_worksheet("건의사항")
-    sheet.append_row([company, get_today(), title, content, author, "TRUE" if is_private else "FALSE", str(password)])
-    st.cache_data.clear()
-
-def save_attendance(company, name, type_val, date_range_str, reason, password, approver):
-    sheet = get_worksheet("근태신청")
-    initial_status = "승인대기"
-    if company == "장안 제이유":
-        if approver == "MASTER": initial_status = "최종승인대기" 
-        elif approver in JANGAN_FOREMEN: initial_status = "1차승인대기"
-        else: initial_status = "2차승인대기"
-    else:
-        initial_status = "승인대기" 
-        
-    sheet.append_row([company, get_today(), name, type_val, date_range_str, reason, initial_status, str(password), approver])
-    st.cache_data.clear()
-
-def save_schedule(company, date_str, title, content, author):
-    sheet = get_worksheet("일정관리")
-    sheet.append_row([company, date_str, title, content, author])
-    st.cache_data.clear()
-
-def update_attendance_step(sheet_name, row_idx, new_status, next_approver=None, reject_reason=None):
-    sheet = get_worksheet(sheet_name)
-    sheet.update_cell(row_idx + 2, 7, new_status)
-    if next_approver: sheet.update_cell(row_idx + 2, 9, next_approver)
-    if reject_reason: sheet.update_cell(row_idx + 2, 10, reject_reason)
-    st.cache_data.clear()
-
-def delete_row_by_index(sheet_name, row_idx):
-    sheet = get_worksheet(sheet_name)
-    sheet.delete_rows(row_idx + 2)
-    st.cache_data.clear()
-
-def update_data_cell(sheet_name, row_idx, col_idx, new_value):
-    sheet = get_worksheet(sheet_name)
-    sheet.update_cell(row_idx + 2, col_idx, new_value)
-    st.cache_data.clear()
-
-def calculate_leave_usage(date_str, leave_type):
-    usage = {}
-    try:
-        if "반차" in leave_type:
-            try:
-                d_str = date_str[:10]
-                datetime.strptime(d_str, "%Y-%m-%d")
-                usage[d_str[:7]] = 0.5
-            except: pass
-            return usage
-        
-        s_date = None
-        e_date = None
-        if "~" in date_str:
-            parts = date_str.split('~')
-            start_part = parts[0].strip()
-            end_part = parts[1].strip()
-            s_date = datetime.strptime(start_part[:10], "%Y-%m-%d").date()
-            if len(end_part) >= 10 and end_part[4] == '-':
-                 e_date = datetime.strptime(end_part[:10], "%Y-%m-%d").date()
-            else: e_date = s_date
-        else:
-            s_date = datetime.strptime(date_str[:10], "%Y-%m-%d").date()
-            e_date = s_date
-
-        kr_holidays = holidays.KR(years=[s_date.year, e_date.year])
-        curr = s_date
-        while curr <= e_date:
-            if curr.weekday() < 5 and curr not in kr_holidays:
-                m = curr.strftime("%Y-%m")
-                usage[m] = usage.get(m, 0) + 1.0
-            curr += timedelta(days=1)
-    except: pass
-    return usage
-
 # ==========================================
 # [0] 로그인 화면
 # ==========================================
@@ -399,540 +217,653 @@ if 'company_name' not in st.session_state:
 # ==========================================
 COMPANY = st.session_state['company_name']
 
-with main_container.container():
-    st.title(f"🏢 {COMPANY}")
+if 'show_sugg_form' not in st.session_state: st.session_state['show_sugg_form'] = False
+if 'show_attend_form' not in st.session_state: st.session_state['show_attend_form'] = False
+
+def toggle_sugg(): st.session_state['show_sugg_form'] = not st.session_state['show_sugg_form']
+def toggle_attend(): st.session_state['show_attend_form'] = not st.session_state['show_attend_form']
+
+def event_range(r):
+    # 달력 이벤트용 (시작일, 종료일+1) - 종료일은 달력에서 미포함이므로 하루 더함
+    start_d, end_d = r['기간시작'].date(), r['기간종료'].date()
+    if end_d > start_d: return str(start_d), str(end_d + timedelta(days=1))
+    return str(start_d), str(start_d)
+
+def get_row(sheet_name, idx):
+    # 항목 프래그먼트가 자기 동작 후 자신의 행만 다시 읽을 때 사용 (캐시된 데이터에서 조회)
+    df = load_data(sheet_name, COMPANY)
+    if df.empty or idx not in df.index: return None
+    return df.loc[idx]
+
+def rerun_fragment():
+    # 프래그먼트 안의 동작이 전체 실행과 합쳐져 처리되면 scope="fragment" 를 쓸 수 없으므로 전체 다시 실행
+    try: st.rerun(scope="fragment")
+    except StreamlitAPIException: st.rerun()
+
+@st.fragment(run_every=VERSION_POLL_SEC)
+def watch_versions():
+    # 버전 스탬프만 주기적으로 확인하고, 바뀐 경우에만 화면 전체를 다시 그림
+    versions = get_sheet_versions()
+    seen = st.session_state.get('seen_versions')
+    st.session_state['seen_versions'] = versions
+    if seen is not None and versions and versions != seen:
+        st.rerun()
 
-    if 'show_sugg_form' not in st.session_state: st.session_state['show_sugg_form'] = False
-    if 'show_attend_form' not in st.session_state: st.session_state['show_attend_form'] = False
+# ==========================================
+# [화면] 프래그먼트 (버튼 동작 시 해당 영역만 다시 실행)
+# - 수정/승인: 해당 항목만 다시 그림 (rerun_fragment)
+# - 삭제/로그인: 행 번호나 화면 구성이 바뀌므로 전체 다시 실행 (st.rerun())
+# ==========================================
+@st.fragment
+def render_admin_grid(sheet_name, df, columns, key, bool_cols=(), disabled=(), red_title=False):
+    """관리자 일괄 수정 표 (행마다 입력창을 만들지 않고, 바뀐 셀만 모아 한 번에 저장)"""
+    original = df[columns]
+    view = pd.DataFrame({c: original[c].astype(str) for c in columns}, index=original.index)
+    for c in bool_cols: view[c] = view[c].str.upper() == "TRUE"
+    if red_title:
+        view.insert(0, "휴무", view['제목'].str.startswith("[RED]"))
+        view['제목'] = view['제목'].str.replace("[RED]", "", regex=False)
+    view["삭제"] = False
+
+    edited = st.data_editor(view, key=key, hide_index=True, use_container_width=True, num_rows="fixed",
+                            disabled=list(disabled), column_config={"삭제": st.column_config.CheckboxColumn("🗑️ 삭제")})
+    if st.button("💾 변경 사항 저장", key=f"{key}_save"):
+        result = edited.drop(columns=["삭제"])
+        for c in bool_cols: result[c] = ["TRUE" if v else "FALSE" for v in result[c]]
+        if red_title:
+            result['제목'] = [f"[RED]{t}" if red else t for t, red in zip(result['제목'], result.pop('휴무'))]
+        deleted = list(edited.index[edited["삭제"].astype(bool)])
+        n_cells, n_rows = apply_sheet_edits(sheet_name, original, result, deleted)
+        if not n_cells and not n_rows: st.info("변경 사항이 없습니다.")
+        else:
+            # 편집 내역은 행 위치 기준이므로 저장 후 비움 (삭제로 행이 밀리면 다른 행에 다시 적용됨)
+            st.session_state.pop(key, None)
+            # 삭제 시 행 번호가 바뀌므로 전체 다시 실행
+            st.success(f"저장 완료 (수정 {n_cells}칸, 삭제 {n_rows}행)"); tm.sleep(1); st.rerun()
+
+@st.fragment
+def render_notice_item(idx, row):
+    # 행은 탭에서 한 번 읽은 프레임에서 받음 (항목 안의 동작은 데이터를 바꾸지 않음)
+    is_imp = str(row.get("중요", "FALSE")).upper() == "TRUE"
+    with st.container(border=True):
+        if is_imp: st.markdown(f":red[**[중요] 🔥 {row['제목']}**]")
+        else: st.subheader(f"📌 {row['제목']}")
+        st.caption(f"📅 {row['작성일']}")
+
+        # 기존 단일 이미지 (이전 방식으로 등록된 공지)
+        img_str = str(row.get('이미지데이터', ''))
+        if len(img_str) > 10: 
+            try:
+                image_bytes = base64.b64decode(img_str)
+                st.image(image_bytes, use_container_width=True)
+            except: pass
 
-    def toggle_sugg(): st.session_state['show_sugg_form'] = not st.session_state['show_sugg_form']
-    def toggle_attend(): st.session_state['show_attend_form'] = not st.session_state['show_attend_form']
+        att_ids = [a for a in str(row.get('첨부', '')).split(",") if a]
+        if att_ids:
+            show_full = st.toggle("🔍 원본 보기", key=f"full_{idx}")
+            thumbs = {} if show_full else load_thumbnails()
+            cols = st.columns(min(len(att_ids), 3))
+            for n, att_id in enumerate(att_ids):
+                img_str = load_full_image(att_id) if show_full else thumbs.get(att_id, "")
+                with cols[n % len(cols)]:
+                    if img_str:
+                        try: st.image(base64.b64decode(img_str), use_container_width=True)
+                        except: pass
+                    else: st.caption("🖼️ 이미지 처리 중...")
+
+        st.markdown(format_multiline(row['내용']))
+
+@st.fragment
+def render_notice_tab():
+    c_space, c_btn = st.columns([0.75, 0.25])
+    with c_btn:
+        if st.button("🔄 새로고침", key="re_1"): 
+            refresh_sheet_versions()
+            rerun_fragment()
+
+    df = load_data("공지사항", COMPANY)
+    if not df.empty and st.session_state.get('logged_in_manager') == "MASTER":
+        with st.expander("🛠️ 관리자 메뉴 (일괄 수정/삭제)"):
+            render_admin_grid("공지사항", df.iloc[::-1], ["작성일", "제목", "내용", "중요"], "grid_notice", bool_cols=["중요"], disabled=["작성일"])
+    if df.empty: 
+        st.info("등록된 공지사항이 없습니다.")
+    else:
+        for idx, row in df.iloc[::-1].iterrows():
+            render_notice_item(idx, row)
 
-    tabs = ["📋 공지", "🗣️ 제안", "📆 근무표", "📅 근태신청", "⚙️ 관리자"]
-    selected_tab = st.radio("메뉴", tabs, horizontal=True, label_visibility="collapsed")
-    
-    st.write("") 
+def render_suggestion_item(row):
+    show_content = True
+    if str(row.get("비공개","FALSE")) == "TRUE": show_content = False 
+    if show_content or st.session_state.get('logged_in_manager') == "MASTER":
+        with st.container(border=True):
+            if str(row.get("비공개","FALSE")) == "TRUE": st.write(f"🔒 **{row['제목']}** (비공개)")
+            else: st.write(f"**{row['제목']}**")
 
-    # 1. 공지사항
-    if selected_tab == "📋 공지":
-        c_space, c_btn = st.columns([0.75, 0.25])
-        with c_btn:
-            if st.button("🔄 새로고침", key="re_1"): 
-                st.cache_data.clear()
-                st.rerun()
-        
-        df = load_data("공지사항", COMPANY)
-        if df.empty: 
-            st.info("등록된 공지사항이 없습니다.")
-        else:
-            for idx, row in df.iloc[::-1].iterrows():
-                is_imp = str(row.get("중요", "FALSE")).upper() == "TRUE"
-                with st.container(border=True):
-                    if is_imp: st.markdown(f":red[**[중요] 🔥 {row['제목']}**]")
-                    else: st.subheader(f"📌 {row['제목']}")
-                    st.caption(f"📅 {row['작성일']}")
-                    
-                    img_str = str(row.get('이미지데이터', ''))
-                    if len(img_str) > 10: 
-                        try:
-                            image_bytes = base64.b64decode(img_str)
-                            st.image(image_bytes, use_container_width=True)
-                        except: pass
-                    
-                    st.markdown(format_multiline(row['내용']))
-                    
-                    if st.session_state.get('logged_in_manager') == "MASTER":
-                        with st.expander("🛠️ 관리자 메뉴 (수정/삭제)"):
-                            u_title = st.text_input("제목 수정", value=row['제목'], key=f"edit_t_{idx}")
-                            u_content = st.text_area("내용 수정", value=row['내용'], key=f"edit_c_{idx}")
-                            c1, c2 = st.columns(2)
-                            if c1.button("💾 수정 저장", key=f"save_{idx}"):
-                                update_data_cell("공지사항", idx, 3, u_title)
-                                update_data_cell("공지사항", idx, 4, u_content)
-                                st.success("수정 완료"); tm.sleep(1); st.rerun()
-                            if c2.button("🗑️ 삭제", key=f"del_{idx}", type="secondary"):
-                                delete_row_by_index("공지사항", idx)
-                                st.success("삭제 완료"); tm.sleep(1); st.rerun()
+            st.caption(f"작성자: {row['작성자']}")
+            if show_content: st.markdown(format_multiline(row['내용']))
 
-    # 2. 제안
-    elif selected_tab == "🗣️ 제안":
-        if st.button("✍️ 제안 작성하기", on_click=toggle_sugg): pass
+@st.fragment
+def render_suggestion_tab():
+    if st.button("✍️ 제안 작성하기", on_click=toggle_sugg): pass
+
+    if st.session_state['show_sugg_form']:
+        with st.container(border=True):
+            st.write("**📝 제안 작성**")
+
+            with st.expander("📝 텍스트 서식 가이드 (열기/닫기)"):
+                st.markdown("""
+                - **줄바꿈**: 엔터(Enter)를 치면 줄바꿈이 됩니다.
+                - **굵게**: 별표 두 개로 감싸기 (예: `**굵은글씨**`)
+                - **기울임**: 별표 한 개로 감싸기 (예: `*기울임*`)
+                - **빨간색**: `:red[내용]` (예: `:red[강조]`)
+                - **리스트**: `- 내용` (예: `- 첫번째`)
+                """)
+
+            with st.form("sugg_form", clear_on_submit=True):
+                c1, c2 = st.columns(2)
+                author = c1.text_input("작성자")
+                pw = c2.text_input("비밀번호(4자리)", type="password")
+                title = st.text_input("제목")
+
+                content = st.text_area("내용 (위의 서식 가이드를 참고하세요)", height=200)
+
+                private = st.checkbox("🔒 비공개")
+                if st.form_submit_button("등록"):
+                    save_suggestion(COMPANY, title, content, author, private, pw)
+                    st.success("✅ 등록되었습니다.")
+                    tm.sleep(1)
+                    st.session_state['show_sugg_form'] = False; rerun_fragment()
+
+    st.divider()
+    df_s = load_data("건의사항", COMPANY)
+    if not df_s.empty and st.session_state.get('logged_in_manager') == "MASTER":
+        with st.expander("🛠️ 관리자 메뉴 (일괄 수정/삭제)"):
+            render_admin_grid("건의사항", df_s.iloc[::-1], ["작성일", "작성자", "제목", "내용", "비공개"], "grid_sugg", bool_cols=["비공개"], disabled=["작성일", "작성자"])
+    if not df_s.empty:
+        for _, row in df_s.iloc[::-1].iterrows():
+            render_suggestion_item(row)
+
+@st.fragment
+def render_calendar_tab():
+    c_space, c_btn, c_view = st.columns([0.55, 0.20, 0.25])
+    with c_space: st.write("")
+    with c_btn:
+        if st.button("🔄 새로고침", key="cal_ref"): 
+            refresh_sheet_versions()
+            st.session_state['calendar_key'] = str(uuid.uuid4())
+            rerun_fragment()
+    with c_view:
+        view_type = st.radio("보기", ["달력", "목록"], horizontal=True, label_visibility="collapsed")
+
+    events = []
+    list_events = []
+
+    now_kst = datetime.now(KST)
+    kr_holidays = holidays.KR(years=[now_kst.year, now_kst.year+1])
+    for d, n in kr_holidays.items():
+        events.append({"title": n, "start": str(d), "color": "#FF4B4B", "extendedProps": {"type": "holiday"}})
+
+    df_sch = load_data("일정관리", COMPANY)
+    if not df_sch.empty and '날짜' in df_sch.columns:
+        for i, r in df_sch.iterrows():
+            start, end = r['날짜'], r['날짜']
+            raw_sch_date = r['날짜']
+            if r['기간정상']: start, end = event_range(r)
+            
+            evt_color = "#8A2BE2" 
+            title_text = str(r['제목'])
+            
+            if title_text.startswith("[RED]"):
+                evt_color = "#EF4444" 
+                title_text = title_text.replace("[RED]", "")
+            elif title_text.startswith("[휴무]"): 
+                evt_color = "#EF4444"
+
+            events.append({
+                "title": f"📢 {title_text}", 
+                "start": start, 
+                "end": end, 
+                "color": evt_color, 
+                "extendedProps": {"content": r['내용'], "type": "schedule", "raw_date": raw_sch_date}
+            })
+            list_events.append({
+                "title": f"📢 {title_text}",
+                "start": raw_sch_date,
+                "end": "",
+                "type": "schedule"
+            })
+
+    df_cal = load_data("근태신청", COMPANY)
+    approved_df = pd.DataFrame()
+    if not df_cal.empty and '상태' in df_cal.columns:
+        approved_df = df_cal[df_cal['상태'] == '최종승인']
+        for i, r in approved_df[approved_df['기간정상']].iterrows():
+            raw_dt = r['날짜및시간']
+            start_d, end_d = event_range(r)
+
+            l_type = r['구분']
+            col = "#3b82f6" if "연차" in l_type else "#ef4444"
+
+            events.append({
+                "title": f"[{r['이름']}] {l_type}", 
+                "start": start_d, "end": end_d, "color": col,
+                "extendedProps": {"name": r['이름'], "type": "leave", "content": r['사유'], "raw_date": raw_dt}
+            })
+            list_events.append({
+                "title": f"[{r['이름']}] {l_type}",
+                "start": raw_dt,
+                "end": "",
+                "type": "leave"
+            })
+
+    if view_type == "달력":
+        calendar_css = """
+            .fc { background: white !important; }
+            .fc-toolbar-title { color: #333333 !important; font-weight: bold !important; font-size: 1.5rem !important; }
+            .fc-button { color: #333333 !important; border: 1px solid #e5e7eb !important; }
+            .fc-daygrid-day-number { color: #333333 !important; text-decoration: none !important; }
+            .fc-col-header-cell-cushion { color: #333333 !important; text-decoration: none !important; font-weight: bold !important; }
+            .fc-day-sun .fc-daygrid-day-number, .fc-day-sun .fc-col-header-cell-cushion { color: #EF4444 !important; }
+            .fc-day-sat .fc-daygrid-day-number, .fc-day-sat .fc-col-header-cell-cushion { color: #3B82F6 !important; }
+        """
+        cal = calendar(events=events, options={"initialView": "dayGridMonth", "height": 750}, key=st.session_state['calendar_key'], custom_css=calendar_css)
         
-        if st.session_state['show_sugg_form']:
+        if cal.get("callback") == "eventClick":
+            evt = cal["eventClick"]["event"]
+            props = evt.get("extendedProps", {})
+            
             with st.container(border=True):
-                st.write("**📝 제안 작성**")
+                st.subheader(f"📌 {evt['title']}")
+                content_val = props.get('content', '')
+                if content_val: st.markdown(format_multiline(content_val))
                 
-                with st.expander("📝 텍스트 서식 가이드 (열기/닫기)"):
-                    st.markdown("""
-                    - **줄바꿈**: 엔터(Enter)를 치면 줄바꿈이 됩니다.
-                    - **굵게**: 별표 두 개로 감싸기 (예: `**굵은글씨**`)
-                    - **기울임**: 별표 한 개로 감싸기 (예: `*기울임*`)
-                    - **빨간색**: `:red[내용]` (예: `:red[강조]`)
-                    - **리스트**: `- 내용` (예: `- 첫번째`)
-                    """)
-
-                with st.form("sugg_form", clear_on_submit=True):
-                    c1, c2 = st.columns(2)
-                    author = c1.text_input("작성자")
-                    pw = c2.text_input("비밀번호(4자리)", type="password")
-                    title = st.text_input("제목")
-                    
-                    content = st.text_area("내용 (위의 서식 가이드를 참고하세요)", height=200)
-                    
-                    private = st.checkbox("🔒 비공개")
-                    if st.form_submit_button("등록"):
-                        save_suggestion(COMPANY, title, content, author, private, pw)
-                        st.success("✅ 등록되었습니다.")
-                        tm.sleep(1)
-                        st.session_state['show_sugg_form'] = False; st.rerun()
-        
-        st.divider()
-        df_s = load_data("건의사항", COMPANY)
-        if not df_s.empty:
-            for idx, row in df_s.iloc[::-1].iterrows():
-                show_content = True
-                if str(row.get("비공개","FALSE")) == "TRUE": show_content = False 
-                if show_content or st.session_state.get('logged_in_manager') == "MASTER":
-                    with st.container(border=True):
-                        if str(row.get("비공개","FALSE")) == "TRUE": st.write(f"🔒 **{row['제목']}** (비공개)")
-                        else: st.write(f"**{row['제목']}**")
-                        
-                        st.caption(f"작성자: {row['작성자']}")
-                        if show_content: st.markdown(format_multiline(row['내용']))
-                        
-                        if st.session_state.get('logged_in_manager') == "MASTER":
-                            with st.expander("🛠️ 관리자 메뉴 (수정/삭제)"):
-                                u_s_title = st.text_input("제목 수정", value=row['제목'], key=f"edit_st_{idx}")
-                                u_s_content = st.text_area("내용 수정", value=row['내용'], key=f"edit_sc_{idx}")
-                                c1, c2 = st.columns(2)
-                                if c1.button("💾 수정 저장", key=f"save_s_{idx}"):
-                                    update_data_cell("건의사항", idx, 3, u_s_title)
-                                    update_data_cell("건의사항", idx, 4, u_s_content)
-                                    st.success("수정 완료"); tm.sleep(1); st.rerun()
-                                if c2.button("🗑️ 삭제", key=f"del_sugg_{idx}", type="secondary"):
-                                    delete_row_by_index("건의사항", idx)
-                                    st.success("삭제 완료"); tm.sleep(1); st.rerun()
-
-    # 3. 근무표
-    elif selected_tab == "📆 근무표":
-        c_space, c_btn, c_view = st.columns([0.55, 0.20, 0.25])
-        with c_space: st.write("")
-        with c_btn:
-            if st.button("🔄 새로고침", key="cal_ref"): 
-                st.cache_data.clear()
-                st.session_state['calendar_key'] = str(uuid.uuid4())
-                st.rerun()
-        with c_view:
-            view_type = st.radio("보기", ["달력", "목록"], horizontal=True, label_visibility="collapsed")
-
-        events = []
-        list_events = []
-
-        now_kst = datetime.now(KST)
-        kr_holidays = holidays.KR(years=[now_kst.year, now_kst.year+1])
-        for d, n in kr_holidays.items():
-            events.append({"title": n, "start": str(d), "color": "#FF4B4B", "extendedProps": {"type": "holiday"}})
-
-        df_sch = load_data("일정관리", COMPANY)
-        if not df_sch.empty and '날짜' in df_sch.columns:
-            for i, r in df_sch.iterrows():
-                start, end = r['날짜'], r['날짜']
-                raw_sch_date = r['날짜']
-                if "~" in r['날짜']:
-                    try:
-                        s, e = r['날짜'].split("~")
-                        start = s.strip()
-                        end = (datetime.strptime(e.strip(), "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
-                    except: pass
-                
-                evt_color = "#8A2BE2" 
-                title_text = str(r['제목'])
+                if props.get("type") == "leave":
+                    name = props.get("name")
+                    user_df = approved_df[approved_df['이름'] == name]
+                    total_usage = {}
+                    for _, u_row in user_df[user_df['기간정상']].iterrows():
+                        usage = calculate_leave_usage(u_row['기간시작'], u_row['기간종료'], u_row['반일여부'])
+                        for m, val in usage.items():
+                            total_usage[m] = total_usage.get(m, 0) + val
+                    st.divider()
+                    st.write(f"📊 **{name}님의 월별 실사용 현황**")
+                    if total_usage:
+                        st.dataframe(pd.DataFrame(list(total_usage.items()), columns=["월", "사용일수"]).sort_values("월"), hide_index=True)
+                    else: st.info("집계된 사용 내역이 없습니다.")
+    else:
+        if list_events:
+            list_df = pd.DataFrame(list_events)
+            st.dataframe(list_df[['title', 'start']], column_config={"title": "내용", "start": "일시"}, hide_index=True, use_container_width=True)
+        else: st.info("등록된 일정이 없습니다.")
+
+    render_staffing_heatmap()
+
+def render_staffing_heatmap():
+    with st.expander("👥 일별 부재 인원 (승인/대기)"):
+        today = datetime.now(KST).date()
+        # 이전 달 ~ 2달 뒤 (월 번호로 계산 - 날짜 더하기로는 1일 기준 -32일이 두 달 전이 됨)
+        base = today.year * 12 + today.month - 1
+        months = [today.replace(year=(base + n) // 12, month=(base + n) % 12 + 1, day=1) for n in range(-1, 3)]
+        month = st.selectbox("월 선택", months, index=1, format_func=lambda d: d.strftime("%Y년 %m월"), key="heat_month")
+        month_end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        counts = get_leave_index(COMPANY).daily_counts(month, month_end)
+
+        # 주(행) x 요일(열) 달력 형태
+        grid = {}
+        for day, (approved, pending) in counts.items():
+            week = f"{(day.day + month.weekday() - 1) // 7 + 1}주"
+            label = f"{day.day}일: {approved}명" + (f" (+{pending})" if pending else "")
+            grid.setdefault(week, {})["월화수목금토일"[day.weekday()]] = label
+        heat_df = pd.DataFrame.from_dict(grid, orient="index", columns=list("월화수목금토일")).fillna("")
+
+        def cell_color(val):
+            try: n = int(str(val).split(": ")[1].split("명")[0])
+            except: return ""
+            if n == 0: return ""
+            return f"background-color: rgba(239, 68, 68, {min(0.15 + 0.15 * n, 0.9)})"
+
+        styler = heat_df.style
+        styler = styler.map(cell_color) if hasattr(styler, "map") else styler.applymap(cell_color)
+        st.dataframe(styler, use_container_width=True)
+        st.caption("괄호 안 숫자는 승인 대기 인원")
+
+@st.fragment
+def render_attendance_tab():
+    st.write("### 📅 연차/근태 신청")
+    if st.button("📝 신청서 작성", on_click=toggle_attend): pass
+    
+    if st.session_state['show_attend_form']:
+        with st.container(border=True):
+            date_mode = st.radio("기간 설정", ["반차/외출/병가 (단일)", "연차/휴가 (기간)"], horizontal=True)
+            final_date_str = ""
+            
+            if date_mode == "반차/외출/병가 (단일)":
+                st.write("**📆 일시 및 시간 선택 (단일)**")
+                dc1, dc2, dc3 = st.columns([1, 1, 1])
                 
-                if title_text.startswith("[RED]"):
-                    evt_color = "#EF4444" 
-                    title_text = title_text.replace("[RED]", "")
-                elif title_text.startswith("[휴무]"): 
-                    evt_color = "#EF4444"
-
-                events.append({
-                    "title": f"📢 {title_text}", 
-                    "start": start, 
-                    "end": end, 
-                    "color": evt_color, 
-                    "extendedProps": {"content": r['내용'], "type": "schedule", "raw_date": raw_sch_date}
-                })
-                list_events.append({
-                    "title": f"📢 {title_text}",
-                    "start": raw_sch_date,
-                    "end": "",
-                    "type": "schedule"
-                })
-
-        df_cal = load_data("근태신청", COMPANY)
-        approved_df = pd.DataFrame()
-        if not df_cal.empty and '상태' in df_cal.columns:
-            approved_df = df_cal[df_cal['상태'] == '최종승인']
-            for i, r in approved_df.iterrows():
-                try:
-                    raw_dt = r.get('날짜및시간', '')
-                    start_d, end_d = raw_dt[:10], raw_dt[:10]
-                    if "~" in raw_dt:
-                        parts = raw_dt.split("~")
-                        start_d = parts[0].strip()[:10]
-                        end_part = parts[1].strip()
-                        if len(end_part) > 5:
-                            end_obj = datetime.strptime(end_part[:10], "%Y-%m-%d") + timedelta(days=1)
-                            end_d = end_obj.strftime("%Y-%m-%d")
-                        else: end_d = start_d
+                with dc1:
+                    d_sel = st.date_input("날짜 선택", value=datetime.now(KST))
+                with dc2:
+                    t_start = ui_time_selector("시작 시간", "s_single", 8, 0)
+                with dc3:
+                    t_end = ui_time_selector("종료 시간", "e_single", 17, 0)
                     
-                    l_type = r['구분']
-                    col = "#3b82f6" if "연차" in l_type else "#ef4444"
+                if t_start > t_end: st.error("⚠️ 종료 시간이 시작 시간보다 빠릅니다.")
+                else: final_date_str = f"{d_sel} {t_start.strftime('%H:%M')} ~ {t_end.strftime('%H:%M')}"
+            else:
+                st.write("**📆 기간 및 시간 선택 (연차/휴가)**")
+                dc1, dc2 = st.columns(2)
+                with dc1:
+                    st.write("📌 **시작 일시**")
+                    d_start = st.date_input("시작일", value=datetime.now(KST), key="d_start_range")
+                    t_start = ui_time_selector("시작 시간", "s_range", 8, 0)
                     
-                    events.append({
-                        "title": f"[{r['이름']}] {l_type}", 
-                        "start": start_d, "end": end_d, "color": col,
-                        "extendedProps": {"name": r['이름'], "type": "leave", "content": r['사유'], "raw_date": raw_dt}
-                    })
-                    list_events.append({
-                        "title": f"[{r['이름']}] {l_type}",
-                        "start": r['날짜및시간'],
-                        "end": "",
-                        "type": "leave"
-                    })
-                except: pass
-
-        if view_type == "달력":
-            calendar_css = """
-                .fc { background: white !important; }
-                .fc-toolbar-title { color: #333333 !important; font-weight: bold !important; font-size: 1.5rem !important; }
-                .fc-button { color: #333333 !important; border: 1px solid #e5e7eb !important; }
-                .fc-daygrid-day-number { color: #333333 !important; text-decoration: none !important; }
-                .fc-col-header-cell-cushion { color: #333333 !important; text-decoration: none !important; font-weight: bold !important; }
-                .fc-day-sun .fc-daygrid-day-number, .fc-day-sun .fc-col-header-cell-cushion { color: #EF4444 !important; }
-                .fc-day-sat .fc-daygrid-day-number, .fc-day-sat .fc-col-header-cell-cushion { color: #3B82F6 !important; }
-            """
-            cal = calendar(events=events, options={"initialView": "dayGridMonth", "height": 750}, key=st.session_state['calendar_key'], custom_css=calendar_css)
-            
-            if cal.get("callback") == "eventClick":
-                evt = cal["eventClick"]["event"]
-                props = evt.get("extendedProps", {})
-                
-                with st.container(border=True):
-                    st.subheader(f"📌 {evt['title']}")
-                    content_val = props.get('content', '')
-                    if content_val: st.markdown(format_multiline(content_val))
+                with dc2:
+                    st.write("📌 **종료 일시**")
+                    d_end = st.date_input("종료일", value=datetime.now(KST), key="d_end_range")
+                    t_end = ui_time_selector("종료 시간", "e_range", 17, 0)
                     
-                    if props.get("type") == "leave":
-                        name = props.get("name")
-                        user_df = approved_df[approved_df['이름'] == name]
-                        total_usage = {}
-                        for _, u_row in user_df.iterrows():
-                            usage = calculate_leave_usage(u_row['날짜및시간'], u_row['구분'])
-                            for m, val in usage.items():
-                                total_usage[m] = total_usage.get(m, 0) + val
-                        st.divider()
-                        st.write(f"📊 **{name}님의 월별 실사용 현황**")
-                        if total_usage:
-                            st.dataframe(pd.DataFrame(list(total_usage.items()), columns=["월", "사용일수"]).sort_values("월"), hide_index=True)
-                        else: st.info("집계된 사용 내역이 없습니다.")
-        else:
-            if list_events:
-                list_df = pd.DataFrame(list_events)
-                st.dataframe(list_df[['title', 'start']], column_config={"title": "내용", "start": "일시"}, hide_index=True, use_container_width=True)
-            else: st.info("등록된 일정이 없습니다.")
-
-    # 4. 근태신청 (수정됨: 슬라이더 적용으로 키보드 방지)
-    elif selected_tab == "📅 근태신청":
-        st.write("### 📅 연차/근태 신청")
-        if st.button("📝 신청서 작성", on_click=toggle_attend): pass
-        
-        if st.session_state['show_attend_form']:
-            with st.container(border=True):
-                date_mode = st.radio("기간 설정", ["반차/외출/병가 (단일)", "연차/휴가 (기간)"], horizontal=True)
-                final_date_str = ""
+                if d_start > d_end: st.error("⚠️ 종료일이 시작일보다 빠릅니다.")
+                elif d_start == d_end and t_start > t_end: st.error("⚠️ 종료 시간이 시작 시간보다 빠릅니다.")
+                else: final_date_str = f"{d_start} {t_start.strftime('%H:%M')} ~ {d_end} {t_end.strftime('%H:%M')}"
+            
+            st.info(f"선택: {final_date_str}")
+            
+            with st.form("att_form"):
+                c1, c2 = st.columns(2)
+                name = c1.text_input("이름")
+                pw = c2.text_input("비밀번호(본인확인용)", type="password")
+                type_val = st.selectbox("구분", ["연차", "반차(오전)", "반차(오후)", "조퇴", "외출", "결근"])
                 
-                if date_mode == "반차/외출/병가 (단일)":
-                    st.write("**📆 일시 및 시간 선택 (단일)**")
-                    dc1, dc2, dc3 = st.columns([1, 1, 1])
-                    
-                    with dc1:
-                        d_sel = st.date_input("날짜 선택", value=datetime.now(KST))
-                    with dc2:
-                        t_start = ui_time_selector("시작 시간", "s_single", 8, 0)
-                    with dc3:
-                        t_end = ui_time_selector("종료 시간", "e_single", 17, 0)
-                        
-                    final_date_str = f"{d_sel} {t_start.strftime('%H:%M')} ~ {t_end.strftime('%H:%M')}"
+                if COMPANY == "장안 제이유":
+                    approver_options = JANGAN_FOREMEN + JANGAN_MID + ["MASTER"]
                 else:
-                    st.write("**📆 기간 및 시간 선택 (연차/휴가)**")
-                    dc1, dc2 = st.columns(2)
-                    with dc1:
-                        st.write("📌 **시작 일시**")
-                        d_start = st.date_input("시작일", value=datetime.now(KST), key="d_start_range")
-                        t_start = ui_time_selector("시작 시간", "s_range", 8, 0)
-                        
-                    with dc2:
-                        st.write("📌 **종료 일시**")
-                        d_end = st.date_input("종료일", value=datetime.now(KST), key="d_end_range")
-                        t_end = ui_time_selector("종료 시간", "e_range", 17, 0)
-                        
-                    if d_start > d_end: st.error("⚠️ 종료일이 시작일보다 빠릅니다.")
-                    else: final_date_str = f"{d_start} {t_start.strftime('%H:%M')} ~ {d_end} {t_end.strftime('%H:%M')}"
-                
-                st.info(f"선택: {final_date_str}")
+                    approver_options = ULSAN_APPROVERS + ["MASTER"]
                 
-                with st.form("att_form"):
-                    c1, c2 = st.columns(2)
-                    name = c1.text_input("이름")
-                    pw = c2.text_input("비밀번호(본인확인용)", type="password")
-                    type_val = st.selectbox("구분", ["연차", "반차(오전)", "반차(오후)", "조퇴", "외출", "결근"])
-                    
-                    if COMPANY == "장안 제이유":
-                        approver_options = JANGAN_FOREMEN + JANGAN_MID + ["MASTER"]
+                approver = st.selectbox("승인 요청 대상", approver_options)
+                reason = st.text_input("사유")
+                if st.form_submit_button("신청하기"):
+                    if not name or not pw: st.error("정보를 입력해주세요.")
+                    elif not final_date_str: st.error("신청 기간을 확인해주세요.")
                     else:
-                        approver_options = ULSAN_APPROVERS + ["MASTER"]
-                    
-                    approver = st.selectbox("승인 요청 대상", approver_options)
-                    reason = st.text_input("사유")
-                    if st.form_submit_button("신청하기"):
-                        if not name or not pw: st.error("정보를 입력해주세요.")
-                        else:
-                            save_attendance(COMPANY, name, type_val, final_date_str, reason, pw, approver)
-                            st.success(f"✅ 승인 요청 전송 완료")
-                            tm.sleep(1.5)
-                            st.session_state['show_attend_form']=False; st.rerun()
-        st.divider()
-        with st.form("search"):
-            sc1, sc2 = st.columns(2)
-            s_name = sc1.text_input("이름")
-            s_pw = sc2.text_input("비밀번호", type="password")
-            if st.form_submit_button("조회"):
-                df = load_data("근태신청", COMPANY)
-                if not df.empty and '이름' in df.columns:
-                    my_df = df[(df['이름']==s_name) & (df['비밀번호']==s_pw)]
-                    if my_df.empty: st.error("내역 없음")
-                    else:
-                        for _, r in my_df.iterrows(): 
-                            msg = f"{r['날짜및시간']} | {r['구분']} | {r['상태']}"
-                            if r['상태'] == "반려" and r.get('반려사유'):
-                                msg += f" (사유: {r['반려사유']})"
-                            st.info(msg)
-                else: st.error("데이터가 없습니다.")
-
-    # 5. 관리자
-    elif selected_tab == "⚙️ 관리자":
-        st.subheader("⚙️ 관리자 전용")
-        if 'logged_in_manager' not in st.session_state:
-            user_db = load_user_db()
-            
+                        save_attendance(COMPANY, name, type_val, final_date_str, reason, pw, approver)
+                        st.success(f"✅ 승인 요청 전송 완료")
+                        tm.sleep(1.5)
+                        st.session_state['show_attend_form']=False; rerun_fragment()
+    st.divider()
+    with st.form("search"):
+        sc1, sc2 = st.columns(2)
+        s_name = sc1.text_input("이름")
+        s_pw = sc2.text_input("비밀번호", type="password")
+        if st.form_submit_button("조회"):
+            df = load_data("근태신청", COMPANY)
+            if not df.empty and '이름' in df.columns:
+                my_df = df[(df['이름']==s_name) & (df['비밀번호']==s_pw)]
+                if my_df.empty: st.error("내역 없음")
+                else:
+                    for _, r in my_df.iterrows(): 
+                        msg = f"{r['날짜및시간']} | {r['구분']} | {r['상태']}"
+                        if r['상태'] == "반려" and r.get('반려사유'):
+                            msg += f" (사유: {r['반려사유']})"
+                        st.info(msg)
+            else: st.error("데이터가 없습니다.")
+
+def pending_status_for(manager_id):
+    if COMPANY == "장안 제이유":
+        if manager_id == "MASTER": return "최종승인대기"
+        elif manager_id == "반장": return "2차승인대기"
+        else: return "1차승인대기"
+    return "승인대기"
+
+def is_pending_for(row, manager_id):
+    if row['상태'] != pending_status_for(manager_id): return False
+    if manager_id in ("MASTER", "반장"): return True
+    return str(row['승인담당자']).strip() == manager_id.strip()
+
+@st.fragment
+def render_approval_item(i, manager_id, r):
+    # 승인/반려 직후 이 항목만 다시 실행될 때는 인자로 받은 행이 이전 상태이므로 다시 조회
+    if st.session_state.pop(f"acted_{i}", False): r = get_row("근태신청", i)
+    if r is None: return
+    title_text = f"[{r['구분']}] {r['날짜및시간']} - {r['이름']}"
+    if not is_pending_for(r, manager_id):
+        st.caption(f"✔️ 처리 완료: {title_text} ({r['상태']})")
+        return
+    with st.expander(title_text):
+        st.write(f"구분: **{r['구분']}**")
+        st.write(f"사유: {r['사유']}")
+        if r['기간정상']:
+            overlap = get_leave_index(COMPANY).who_is_off(r['기간시작'].date(), r['기간종료'].date(), exclude=i)
+            approved = [e[1] for e in overlap if e[3] == "최종승인"]
+            pending = [e[1] for e in overlap if e[3] != "최종승인"]
+            msg = f"👥 같은 기간 부재: 승인 {len(approved)}명 / 대기 {len(pending)}명"
+            if overlap: msg += f" ({', '.join(dict.fromkeys(approved + pending))})"
+            st.caption(msg)
+        reject_reason = st.text_input("반려 사유 (반려 시에만 입력)", key=f"rej_reason_{i}")
+        c_app, c_rej = st.columns(2)
+        if c_app.button("승인", key=f"app_{i}"):
             if COMPANY == "장안 제이유":
-                manager_options = ["선택안함"] + JANGAN_FOREMEN + JANGAN_MID 
+                if manager_id == "MASTER": update_attendance_step("근태신청", i, "최종승인")
+                elif manager_id == "반장": update_attendance_step("근태신청", i, "최종승인대기", "MASTER")
+                else: update_attendance_step("근태신청", i, "2차승인대기", "반장")
             else:
-                manager_options = ["선택안함"] + ULSAN_APPROVERS 
+                update_attendance_step("근태신청", i, "최종승인")
+            st.session_state[f"acted_{i}"] = True
+            st.success("승인됨"); tm.sleep(1); rerun_fragment()
+
+        if c_rej.button("반려", key=f"rej_{i}"):
+            update_attendance_step("근태신청", i, "반려", reject_reason=reject_reason)
+            st.session_state[f"acted_{i}"] = True
+            st.error("반려됨"); tm.sleep(1); rerun_fragment()
+
+def render_approval_inbox(manager_id):
+    df = load_data("근태신청", COMPANY)
+    if not df.empty and '상태' in df.columns:
+        if COMPANY == "장안 제이유":
+            if manager_id == "MASTER": st.info("📢 최종 승인 대기")
+            elif manager_id == "반장": st.info("📢 반장 승인 대기")
+            else: st.info("📢 조장 승인 대기")
+        else:
+            if manager_id == "MASTER": st.info("📢 전체 승인 대기 (Master 권한)")
+            elif manager_id in ULSAN_APPROVERS: st.info(f"📢 {manager_id}님 승인 대기")
 
-            selected_name = st.selectbox("관리자 선택", manager_options)
-            
-            if selected_name != "선택안함":
-                if selected_name not in user_db:
-                    st.warning(f"🔒 '{selected_name}' 초기 비밀번호 설정")
-                    with st.form("init_pw"):
-                        new_pw = st.text_input("새 비밀번호", type="password")
-                        chk_pw = st.text_input("확인", type="password")
-                        if st.form_submit_button("설정"):
-                            if new_pw == chk_pw and new_pw:
-                                user_db[selected_name] = new_pw
-                                save_user_db(user_db)
-                                st.success("설정 완료!"); tm.sleep(1); st.rerun()
-                            else: st.error("비밀번호 불일치")
+        pending = [(i, r) for i, r in df.iterrows() if is_pending_for(r, manager_id)]
+        if not pending: st.info("대기중인 건이 없습니다.")
+        else:
+            for i, r in pending:
+                render_approval_item(i, manager_id, r)
+    else: st.info("데이터 없음")
+
+@st.fragment
+def render_post_manager(manager_id):
+    st.write("### 📝 공지사항/일정 등록")
+
+    with st.expander("📝 텍스트 서식 가이드 (열기/닫기)"):
+        st.markdown("""
+        - **줄바꿈**: 엔터(Enter)를 치면 줄바꿈이 됩니다.
+        - **굵게**: 별표 두 개로 감싸기 (예: `**굵은글씨**`)
+        - **기울임**: 별표 한 개로 감싸기 (예: `*기울임*`)
+        - **빨간색**: `:red[내용]` (예: `:red[강조]`)
+        - **리스트**: `- 내용` (예: `- 첫번째`)
+        """)
+
+    with st.form("n_form", clear_on_submit=True):
+        type_sel = st.selectbox("유형", ["공지사항", "일정"])
+        t = st.text_input("제목")
+        c = st.text_area("내용", height=200, help="위의 서식 가이드를 참고하여 작성하세요.")
+
+        uploaded_img = None
+        if type_sel == "공지사항":
+            uploaded_img = st.file_uploader("📷 사진 첨부 (선택, 여러 장 가능)", type=['png', 'jpg', 'jpeg', 'webp'], accept_multiple_files=True)
+
+        is_imp = st.checkbox("중요 공지", value=False)
+        d_range = st.date_input("날짜 (기간 선택 가능)", value=[datetime.now(KST).date()])
+        is_holiday = False
+        if manager_id == "MASTER" and type_sel == "일정":
+            is_holiday = st.checkbox("🚩 전사 휴무/특별 일정 (캘린더에 빨간색 표시)")
+
+        if st.form_submit_button("등록"):
+            if type_sel == "공지사항": 
+                save_notice(COMPANY, t, c, is_imp, uploaded_img)
+            else: 
+                final_date_str = ""
+                if len(d_range) == 2: final_date_str = f"{d_range[0]} ~ {d_range[1]}"
+                elif len(d_range) == 1: final_date_str = str(d_range[0])
                 else:
-                    with st.form("manager_login_form"):
-                        input_pw = st.text_input("비밀번호", type="password")
-                        if st.form_submit_button("로그인"):
-                            if str(input_pw) == str(user_db[selected_name]):
-                                st.session_state['logged_in_manager'] = selected_name; st.rerun()
-                            else: st.error("비밀번호 오류")
+                    st.error("날짜를 선택해주세요.")
+                    st.stop()
+                final_title = t
+                if is_holiday: final_title = f"[RED]{t}"
+                save_schedule(COMPANY, final_date_str, final_title, c, manager_id)
+            st.success("등록 완료"); tm.sleep(1); rerun_fragment()
+
+    st.divider()
+    st.write("### 📋 등록된 일정 관리 (수정/삭제)")
+    df_sch = load_data("일정관리", COMPANY)
+    if manager_id != "MASTER": df_sch = df_sch[df_sch['작성자'] == manager_id] if not df_sch.empty else df_sch
+    if df_sch.empty: st.info("등록된 일정이 없습니다.")
+    else:
+        render_admin_grid("일정관리", df_sch, ["날짜", "제목", "내용"], "grid_schedule", red_title=True,
+                          disabled=[] if manager_id == "MASTER" else ["휴무"])
+
+def render_parse_failures():
+    # 날짜를 해석하지 못한 행은 달력/부재 인원/집계에서 빠지므로 상태와 관계없이 모두 표시
+    df_att = load_data("근태신청", COMPANY)
+    df_sch = load_data("일정관리", COMPANY)
+    failed_att = df_att[~df_att['기간정상']] if '기간정상' in df_att.columns else df_att.iloc[0:0]
+    failed_sch = df_sch[~df_sch['기간정상']] if '기간정상' in df_sch.columns else df_sch.iloc[0:0]
+    if failed_att.empty and failed_sch.empty: return
+    st.warning(f"⚠️ 날짜를 해석하지 못한 근태신청 {len(failed_att)}건, 일정 {len(failed_sch)}건은 달력과 집계에서 제외되었습니다. (시트에서 날짜를 고쳐주세요)")
+    with st.expander("해석 실패 목록"):
+        if not failed_att.empty:
+            st.write("**근태신청**")
+            st.dataframe(failed_att.assign(시트행=failed_att.index + 2)[['시트행', '이름', '구분', '날짜및시간', '상태']], hide_index=True, use_container_width=True)
+        if not failed_sch.empty:
+            st.write("**일정관리**")
+            st.dataframe(failed_sch.assign(시트행=failed_sch.index + 2)[['시트행', '날짜', '제목', '작성자']], hide_index=True, use_container_width=True)
+
+def render_leave_stats():
+    st.write("### 📊 월별 연차 사용 현황")
+    render_parse_failures()
+    df = load_data("근태신청", COMPANY)
+    if not df.empty and '상태' in df.columns:
+        try:
+            df = df[df['상태'] == '최종승인']
+            stats_data = {} 
+            for _, row in df[df['기간정상']].iterrows():
+                usage = calculate_leave_usage(row['기간시작'], row['기간종료'], row['반일여부'])
+                name = row['이름']
+                if name not in stats_data: stats_data[name] = {}
+                for mon, val in usage.items():
+                    stats_data[name][mon] = stats_data[name].get(mon, 0) + val
             
-            st.write("")
-            if st.toggle("🔐 시스템 최고 관리자 (Master) 로그인"):
-                with st.form("master_login_form"):
-                    master_pw = st.text_input("Master PW", type="password")
-                    if st.form_submit_button("Master Login"):
-                        if master_pw == st.secrets["admin_password"]:
-                            st.session_state['logged_in_manager'] = "MASTER"; st.rerun()
-                        else: st.error("비밀번호 오류")
+            if stats_data:
+                final_list = []
+                for name, mon_data in stats_data.items():
+                    for mon, val in mon_data.items():
+                        final_list.append({"이름": name, "월": mon, "사용일수": val})
+                stat_df = pd.DataFrame(final_list, columns=["이름", "월", "사용일수"])
+                if not stat_df.empty:
+                    pivot = stat_df.pivot_table(index="이름", columns="월", values="사용일수", aggfunc="sum", fill_value=0)
+                    pivot.columns = [f"{c[:4]}년 {c[5:]}월" for c in pivot.columns]
+                    st.dataframe(pivot, use_container_width=True)
+                    buffer = io.BytesIO()
+                    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+                        pivot.to_excel(writer, sheet_name='월별통계')
+                    st.download_button(label="📥 엑셀 다운로드", data=buffer, file_name=f"월별연차사용현황_{get_today()}.xlsx", mime="application/vnd.ms-excel")
+                else: st.info("집계할 데이터가 부족합니다.")
+            else: st.info("집계 데이터 없음")
+        except Exception as e: st.error(f"오류: {e}")
+    else: st.info("데이터 없음")
+
+@st.fragment
+def render_admin_tab():
+    st.subheader("⚙️ 관리자 전용")
+    if 'logged_in_manager' not in st.session_state:
+        user_db = load_user_db()
+        
+        if COMPANY == "장안 제이유":
+            manager_options = ["선택안함"] + JANGAN_FOREMEN + JANGAN_MID 
         else:
-            manager_id = st.session_state['logged_in_manager']
-            manager_name = manager_id
-            
-            c_info, c_logout = st.columns([0.75, 0.25])
-            with c_info: st.success(f"👋 접속중: {manager_name}")
-            with c_logout:
-                if st.button("로그아웃", type="secondary"):
-                    del st.session_state['logged_in_manager']; st.rerun()
-            
-            if manager_id == "MASTER":
-                if st.toggle("🔐 관리자 비밀번호 초기화 (마스터 기능)"):
-                    user_db = load_user_db()
-                    registered_users = [u for u in user_db.keys() if u != "MASTER"]
-                    if not registered_users: st.info("대상 없음")
-                    else:
-                        target = st.selectbox("대상 선택", ["선택안함"] + registered_users)
-                        if target != "선택안함":
-                            if st.button(f"'{target}' 초기화"):
-                                del user_db[target]; save_user_db(user_db)
-                                st.success("초기화 완료"); tm.sleep(1); st.rerun()
-
-            m_tab1, m_tab2, m_tab3 = st.tabs(["✅ 결재", "📢 공지/일정", "📊 통계"])
-            with m_tab1:
-                df = load_data("근태신청", COMPANY)
-                if not df.empty and '상태' in df.columns:
-                    pend = pd.DataFrame()
-                    if COMPANY == "장안 제이유":
-                        if manager_id == "MASTER":
-                            pend = df[df['상태'] == '최종승인대기']
-                            st.info("📢 최종 승인 대기")
-                        elif manager_id == "반장":
-                            pend = df[df['상태'] == '2차승인대기']
-                            st.info("📢 반장 승인 대기")
-                        else:
-                            pend = df[(df['상태'] == '1차승인대기') & (df['승인담당자'] == manager_name)]
-                            st.info("📢 조장 승인 대기")
-                    else:
-                        if manager_id == "MASTER":
-                            pend = df[df['상태'] == '승인대기']
-                            st.info("📢 전체 승인 대기 (Master 권한)")
-                        elif manager_id in ULSAN_APPROVERS:
-                            pend = df[(df['상태'] == '승인대기') & (df['승인담당자'].str.strip() == manager_name.strip())]
-                            st.info(f"📢 {manager_name}님 승인 대기")
-
-                    if pend.empty: st.info("대기중인 건이 없습니다.")
-                    else:
-                        for i, r in pend.iterrows():
-                            title_text = f"{r['날짜']} : {r['제목']}" if '제목' in r else f"[{r['구분']}] {r['날짜및시간']} - {r['이름']}"
-                            with st.expander(title_text):
-                                st.write(f"구분: **{r['구분']}**")
-                                st.write(f"사유: {r['사유']}")
-                                reject_reason = st.text_input("반려 사유 (반려 시에만 입력)", key=f"rej_reason_{i}")
-                                c_app, c_rej = st.columns(2)
-                                if c_app.button("승인", key=f"app_{i}"):
-                                    if COMPANY == "장안 제이유":
-                                        if manager_id == "MASTER": update_attendance_step("근태신청", i, "최종승인")
-                                        elif manager_id == "반장": update_attendance_step("근태신청", i, "최종승인대기", "MASTER")
-                                        else: update_attendance_step("근태신청", i, "2차승인대기", "반장")
-                                    else:
-                                        update_attendance_step("근태신청", i, "최종승인")
-                                    st.success("승인됨"); tm.sleep(1); st.rerun()
-                                    
-                                if c_rej.button("반려", key=f"rej_{i}"):
-                                    update_attendance_step("근태신청", i, "반려", reject_reason=reject_reason)
-                                    st.error("반려됨"); tm.sleep(1); st.rerun()
-                else: st.info("데이터 없음")
-
-            with m_tab2:
-                st.write("### 📝 공지사항/일정 등록")
-                
-                with st.expander("📝 텍스트 서식 가이드 (열기/닫기)"):
-                    st.markdown("""
-                    - **줄바꿈**: 엔터(Enter)를 치면 줄바꿈이 됩니다.
-                    - **굵게**: 별표 두 개로 감싸기 (예: `**굵은글씨**`)
-                    - **기울임**: 별표 한 개로 감싸기 (예: `*기울임*`)
-                    - **빨간색**: `:red[내용]` (예: `:red[강조]`)
-                    - **리스트**: `- 내용` (예: `- 첫번째`)
-                    """)
-
-                with st.form("n_form", clear_on_submit=True):
-                    type_sel = st.selectbox("유형", ["공지사항", "일정"])
-                    t = st.text_input("제목")
-                    c = st.text_area("내용", height=200, help="위의 서식 가이드를 참고하여 작성하세요.")
-                    
-                    uploaded_img = None
-                    if type_sel == "공지사항":
-                        uploaded_img = st.file_uploader("📷 사진 첨부 (선택)", type=['png', 'jpg', 'jpeg'])
-                        
-                    is_imp = st.checkbox("중요 공지", value=False)
-                    d_range = st.date_input("날짜 (기간 선택 가능)", value=[datetime.now(KST).date()])
-                    is_holiday = False
-                    if manager_id == "MASTER" and type_sel == "일정":
-                        is_holiday = st.checkbox("🚩 전사 휴무/특별 일정 (캘린더에 빨간색 표시)")
-
-                    if st.form_submit_button("등록"):
-                        if type_sel == "공지사항": 
-                            save_notice(COMPANY, t, c, is_imp, uploaded_img)
-                        else: 
-                            final_date_str = ""
-                            if len(d_range) == 2: final_date_str = f"{d_range[0]} ~ {d_range[1]}"
-                            elif len(d_range) == 1: final_date_str = str(d_range[0])
-                            else:
-                                st.error("날짜를 선택해주세요.")
-                                st.stop()
-                            final_title = t
-                            if is_holiday: final_title = f"[RED]{t}"
-                            save_schedule(COMPANY, final_date_str, final_title, c, manager_name)
-                        st.success("등록 완료"); tm.sleep(1); st.rerun()
-                
-                st.divider()
-                st.write("### 📋 등록된 일정 관리 (수정/삭제)")
-                df_sch = load_data("일정관리", COMPANY)
-                if not df_sch.empty:
-                    for i, r in df_sch.iterrows():
-                        if manager_id == "MASTER" or r['작성자'] == manager_name:
-                            title_text = f"{r['날짜']} : {r['제목']}"
-                            with st.expander(title_text):
-                                existing_title = str(r['제목'])
-                                is_red = False
-                                clean_title = existing_title
-                                if existing_title.startswith("[RED]"):
-                                    is_red = True
-                                    clean_title = existing_title.replace("[RED]", "")
-                                
-                                new_date_str = st.text_input("날짜", value=r['날짜'], key=f"edit_sd_{i}")
-                                new_title = st.text_input("제목", value=clean_title, key=f"edit_st_{i}")
-                                new_content = st.text_area("내용", value=r['내용'], key=f"edit_sc_{i}")
-                                new_is_red = is_red
-                                if manager_id == "MASTER":
-                                    new_is_red = st.checkbox("🚩 휴무 태그", value=is_red, key=f"chk_red_{i}")
-                                
-                                c1, c2 = st.columns(2)
-                                if c1.button("수정", key=f"upd_s_{i}"):
-                                    final_t = new_title
-                                    if new_is_red: final_t = f"[RED]{new_title}"
-                                    update_data_cell("일정관리", i, 2, new_date_str)
-                                    update_data_cell("일정관리", i, 3, final_t)
-                                    update_data_cell("일정관리", i, 4, new_content)
-                                    st.success("수정됨"); tm.sleep(1); st.rerun()
-                                if c2.button("삭제", key=f"del_s_{i}", type="secondary"):
-                                    delete_row_by_index("일정관리", i)
-                                    st.success("삭제됨"); tm.sleep(1); st.rerun()
-
-            with m_tab3:
-                st.write("### 📊 월별 연차 사용 현황")
-                df = load_data("근태신청", COMPANY)
-                if not df.empty and '상태' in df.columns:
-                    try:
-                        df = df[df['상태'] == '최종승인']
-                        stats_data = {} 
-                        for _, row in df.iterrows():
-                            usage = calculate_leave_usage(row['날짜및시간'], row['구분'])
-                            name = row['이름']
-                            if name not in stats_data: stats_data[name] = {}
-                            for mon, val in usage.items():
-                                stats_data[name][mon] = stats_data[name].get(mon, 0) + val
-                        
-                        if stats_data:
-                            final_list = []
-                            for name, mon_data in stats_data.items():
-                                for mon, val in mon_data.items():
-                                    final_list.append({"이름": name, "월": mon, "사용일수": val})
-                            stat_df = pd.DataFrame(final_list, columns=["이름", "월", "사용일수"])
-                            if not stat_df.empty:
-                                pivot = stat_df.pivot_table(index="이름", columns="월", values="사용일수", aggfunc="sum", fill_value=0)
-                                pivot.columns = [f"{c[:4]}년 {c[5:]}월" for c in pivot.columns]
-                                st.dataframe(pivot, use_container_width=True)
-                                buffer = io.BytesIO()
-                                with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                                    pivot.to_excel(writer, sheet_name='월별통계')
-                                st.download_button(label="📥 엑셀 다운로드", data=buffer, file_name=f"월별연차사용현황_{get_today()}.xlsx", mime="application/vnd.ms-excel")
-                            else: st.info("집계할 데이터가 부족합니다.")
-                        else: st.info("집계 데이터 없음")
-                    except Exception as e: st.error(f"오류: {e}")
-                else: st.info("데이터 없음")
\ No newline at end of file
+            manager_options = ["선택안함"] + ULSAN_APPROVERS 
+
+        selected_name = st.selectbox("관리자 선택", manager_options)
+        
+        if selected_name != "선택안함":
+            if selected_name not in user_db:
+                st.warning(f"🔒 '{selected_name}' 초기 비밀번호 설정")
+                with st.form("init_pw"):
+                    new_pw = st.text_input("새 비밀번호", type="password")
+                    chk_pw = st.text_input("확인", type="password")
+                    if st.form_submit_button("설정"):
+                        if new_pw == chk_pw and new_pw:
+                            upsert_manager(selected_name, new_pw)
+                            st.success("설정 완료!"); tm.sleep(1); rerun_fragment()
+                        else: st.error("비밀번호 불일치")
+            else:
+                with st.form("manager_login_form"):
+                    input_pw = st.text_input("비밀번호", type="password")
+                    if st.form_submit_button("로그인"):
+                        stored_pw = user_db[selected_name]["pw"]
+                        if verify_password(stored_pw, input_pw):
+                            if is_legacy_password(stored_pw): upsert_manager(selected_name, input_pw)
+                            st.session_state['logged_in_manager'] = selected_name; st.rerun()
+                        else: st.error("비밀번호 오류")
+        
+        st.write("")
+        if st.toggle("🔐 시스템 최고 관리자 (Master) 로그인"):
+            with st.form("master_login_form"):
+                master_pw = st.text_input("Master PW", type="password")
+                if st.form_submit_button("Master Login"):
+                    if master_pw == st.secrets["admin_password"]:
+                        st.session_state['logged_in_manager'] = "MASTER"; st.rerun()
+                    else: st.error("비밀번호 오류")
+    else:
+        manager_id = st.session_state['logged_in_manager']
+        manager_name = manager_id
+        
+        c_info, c_logout = st.columns([0.75, 0.25])
+        with c_info: st.success(f"👋 접속중: {manager_name}")
+        with c_logout:
+            if st.button("로그아웃", type="secondary"):
+                del st.session_state['logged_in_manager']; st.rerun()
+        
+        if manager_id == "MASTER":
+            if st.toggle("🔐 관리자 비밀번호 초기화 (마스터 기능)"):
+                user_db = load_user_db()
+                registered_users = [u for u in user_db.keys() if u != "MASTER"]
+                if not registered_users: st.info("대상 없음")
+                else:
+                    target = st.selectbox("대상 선택", ["선택안함"] + registered_users)
+                    if target != "선택안함":
+                        if st.button(f"'{target}' 초기화"):
+                            delete_manager(target)
+                            st.success("초기화 완료"); tm.sleep(1); rerun_fragment()
+
+        m_tab1, m_tab2, m_tab3 = st.tabs(["✅ 결재", "📢 공지/일정", "📊 통계"])
+        with m_tab1: render_approval_inbox(manager_id)
+        with m_tab2: render_post_manager(manager_id)
+        with m_tab3: render_leave_stats()
+
+with main_container.container():
+    st.title(f"🏢 {COMPANY}")
+
+    tabs = ["📋 공지", "🗣️ 제안", "📆 근무표", "📅 근태신청", "⚙️ 관리자"]
+    selected_tab = st.radio("메뉴", tabs, horizontal=True, label_visibility="collapsed")
+    
+    st.write("") 
+    # 전체 실행은 어차피 최신 버전으로 그리므로 기준 버전만 갱신
+    # (여기서 다시 실행하면 방금 누른 버튼/제출한 양식이 사라짐 - 다시 그리기는 주기 확인에서만)
+    st.session_state['seen_versions'] = get_sheet_versions()
+    watch_versions()
+
+    # 1. 공지사항
+    if selected_tab == "📋 공지": render_notice_tab()
+    # 2. 제안
+    elif selected_tab == "🗣️ 제안": render_suggestion_tab()
+    # 3. 근무표
+    elif selected_tab == "📆 근무표": render_calendar_tab()
+    # 4. 근태신청 (슬라이더 적용으로 키보드 방지)
+    elif selected_tab == "📅 근태신청": render_attendance_tab()
+    # 5. 관리자
+    elif selected_tab == "⚙️ 관리자": render_admin_tab()
\ No newline at end of file
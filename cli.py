@@ -0,0 +1,154 @@
+"""제이유 사내광장 일괄 가져오기/내보내기 도구
+
+앱과 같은 storage 모듈(시트 접속, 열 순서, 승인 단계, 버전 스탬프)을 그대로 사용합니다.
+인증 정보는 앱과 동일하게 .streamlit/secrets.toml 에서 읽으므로 저장소 루트에서 실행하세요.
+
+    python cli.py import 근태신청 backfill.xlsx --company "장안 제이유"
+    python cli.py export 근태신청 근태.parquet
+    python cli.py migrate-dates
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+from leave import parse_leave
+from storage import (
+    COMPANIES, REQUIRED_COLS, CANONICAL_COLS, get_today, get_worksheet, fetch_sheet_frame,
+    initial_attendance_status, mark_changed, ensure_columns, canonical_values,
+    migrate_canonical_columns,
+)
+
+STATE_FILE = ".import_state.json"
+CREATED_COLS = {"근태신청": "신청일", "공지사항": "작성일", "건의사항": "작성일"}
+
+def read_table(path):
+    if path.lower().endswith((".xlsx", ".xls")):
+        try: return pd.read_excel(path, dtype=str).fillna("")
+        except ImportError: sys.exit("XLSX 파일을 읽으려면 openpyxl 패키지가 필요합니다. (pip install openpyxl)")
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""): h.update(block)
+    return h.hexdigest()
+
+def load_state():
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def save_state(state):
+    with open(STATE_FILE, "w", encoding="utf-8") as f: json.dump(state, f, ensure_ascii=False, indent=2)
+
+def validate_rows(sheet_name, df, company=None):
+    """시트 열 순서대로 정리한 행 목록과 (행번호, 사유) 오류 목록을 반환"""
+    cols = REQUIRED_COLS[sheet_name]
+    companies = set(COMPANIES.values())
+    rows, errors = [], []
+    for n, rec in enumerate(df.to_dict("records"), start=2):
+        rec = {k: str(v).strip() for k, v in rec.items()}
+        if company: rec['소속'] = company
+        if rec.get('소속') not in companies:
+            errors.append((n, f"알 수 없는 소속: {rec.get('소속')}")); continue
+        if sheet_name in CANONICAL_COLS:
+            date_col, canon_cols = CANONICAL_COLS[sheet_name]
+            if parse_leave(rec.get(date_col, "")) is None:
+                errors.append((n, f"{date_col} 형식 오류: {rec.get(date_col)}")); continue
+            rec.update(zip(canon_cols, canonical_values(sheet_name, rec[date_col], rec.get('구분', ""))))
+        if sheet_name == "근태신청":
+            if not rec.get('이름') or not rec.get('구분'):
+                errors.append((n, "이름/구분 누락")); continue
+            if not rec.get('상태'): rec['상태'] = initial_attendance_status(rec['소속'], rec.get('승인담당자', ""))
+        created_col = CREATED_COLS.get(sheet_name)
+        if created_col and not rec.get(created_col): rec[created_col] = get_today()
+        rows.append([rec.get(c, "") for c in cols])
+    return rows, errors
+
+def cmd_import(args):
+    if args.sheet not in REQUIRED_COLS:
+        sys.exit(f"가져오기를 지원하지 않는 시트입니다: {args.sheet} (지원: {', '.join(REQUIRED_COLS)})")
+    df = read_table(args.file)
+    optional = ('소속', '상태', *CREATED_COLS.values(), *CANONICAL_COLS.get(args.sheet, ("", []))[1])
+    missing = [c for c in REQUIRED_COLS[args.sheet] if c not in df.columns and c not in optional]
+    if missing: sys.exit(f"필수 열 누락: {', '.join(missing)}")
+
+    rows, errors = validate_rows(args.sheet, df, args.company)
+    for n, reason in errors: print(f"  [건너뜀] {n}행: {reason}")
+    if errors:
+        rejected = os.path.splitext(args.file)[0] + ".rejected.csv"
+        df.iloc[[n - 2 for n, _ in errors]].assign(오류=[r for _, r in errors]).to_csv(rejected, index=False, encoding="utf-8-sig")
+        print(f"오류 {len(errors)}건 -> {rejected}")
+
+    # 같은 파일을 다시 실행하면 이미 기록한 행 다음부터 이어서 기록
+    state = load_state()
+    key = f"{args.sheet}:{file_digest(args.file)}"
+    done = 0 if args.restart else state.get(key, 0)
+    if done: print(f"이전 실행에서 {done}행 기록됨 - 이어서 진행")
+
+    sheet = get_worksheet(args.sheet)
+    ensure_columns(sheet, args.sheet)
+    resumed_from = done
+    try:
+        for start in range(done, len(rows), args.chunk):
+            chunk = rows[start:start + args.chunk]
+            sheet.append_rows(chunk)
+            done = start + len(chunk)
+            state[key] = done
+            save_state(state)
+            print(f"  {done}/{len(rows)}행 기록")
+    finally:
+        # 이번 실행에서 실제로 추가한 행이 있을 때만 버전 갱신 (모든 레플리카가 다시 읽게 됨)
+        if done > resumed_from: mark_changed(args.sheet)
+    print(f"완료: {args.sheet} {len(rows)}행")
+
+def cmd_export(args):
+    df = fetch_sheet_frame(args.sheet)
+    if args.company and '소속' in df.columns:
+        df = df[df['소속'] == args.company]
+    if args.out.lower().endswith(".parquet"):
+        try: df.to_parquet(args.out, index=False)
+        except ImportError: sys.exit("Parquet 내보내기에는 pyarrow 패키지가 필요합니다. (pip install pyarrow)")
+    else:
+        df.to_csv(args.out, index=False, encoding="utf-8-sig")
+    print(f"완료: {args.sheet} {len(df)}행 -> {args.out}")
+
+def cmd_migrate_dates(args):
+    unknown = [s for s in args.sheets if s not in CANONICAL_COLS]
+    if unknown: sys.exit(f"구조화 열이 없는 시트입니다: {', '.join(unknown)}")
+    for sheet_name in args.sheets or list(CANONICAL_COLS):
+        filled, failed = migrate_canonical_columns(sheet_name)
+        print(f"{sheet_name}: 구조화 열 {filled}행 채움, 해석 실패 {len(failed)}건")
+        for row_no, raw in failed: print(f"  [해석 실패] {row_no}행: {raw!r}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사내공지사항DB 일괄 가져오기/내보내기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_imp = sub.add_parser("import", help="CSV/XLSX 파일을 시트에 추가")
+    p_imp.add_argument("sheet", help="대상 시트 (근태신청, 일정관리, 공지사항, 건의사항)")
+    p_imp.add_argument("file", help="CSV 또는 XLSX 파일 (첫 행은 시트와 같은 열 이름)")
+    p_imp.add_argument("--company", choices=sorted(set(COMPANIES.values())), help="모든 행의 소속을 지정")
+    p_imp.add_argument("--chunk", type=int, default=500, help="한 번에 기록할 행 수 (기본 500)")
+    p_imp.add_argument("--restart", action="store_true", help="진행 기록을 무시하고 처음부터 기록")
+    p_imp.set_defaults(func=cmd_import)
+
+    p_exp = sub.add_parser("export", help="시트를 CSV/Parquet 파일로 저장")
+    p_exp.add_argument("sheet", help="내보낼 시트 이름")
+    p_exp.add_argument("out", help="출력 파일 (.csv 또는 .parquet)")
+    p_exp.add_argument("--company", help="해당 소속만 내보내기")
+    p_exp.set_defaults(func=cmd_export)
+
+    p_mig = sub.add_parser("migrate-dates", help="기존 행의 날짜 원문으로 시작/종료 구조화 열을 채움 (1회)")
+    p_mig.add_argument("sheets", nargs="*", help=f"대상 시트 ({', '.join(CANONICAL_COLS)} / 기본: 전체)")
+    p_mig.set_defaults(func=cmd_migrate_dates)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import io
+import base64
+from PIL import Image, ImageOps
+
+# =========================================================
+# [이미지 파이프라인] 프로세스 풀에서 실행되는 순수 함수 모음
+# (Streamlit 의존성 없음 - 자식 프로세스에서 import 가능해야 함)
+# =========================================================
+CELL_LIMIT = 49000  # 구글 시트 셀 최대 글자수(50,000) 여유분
+
+# 용도별 크기 (긴 변 기준 px, 초기 품질)
+SIZES = {
+    "thumb": (360, 70),
+    "full": (1280, 80),
+}
+
+def _encode(img, quality):
+    buffered = io.BytesIO()
+    # exif 인자를 넘기지 않으므로 EXIF/GPS 정보는 저장되지 않음
+    img.save(buffered, format="WEBP", quality=quality, method=4)
+    return base64.b64encode(buffered.getvalue()).decode()
+
+def _fit_to_cell(img, max_side, quality):
+    img = img.copy()
+    img.thumbnail((max_side, max_side))
+    img_str = _encode(img, quality)
+    # 셀 한도를 넘으면 품질 -> 크기 순으로 줄여가며 재인코딩
+    while len(img_str) > CELL_LIMIT:
+        if quality > 40:
+            quality -= 10
+        else:
+            img = img.resize((max(1, int(img.width * 0.8)), max(1, int(img.height * 0.8))))
+        img_str = _encode(img, quality)
+    return img_str
+
+def process_image(data):
+    """원본 바이트 -> {"thumb": base64, "full": base64} (WebP, EXIF 제거, 회전 보정)"""
+    img = Image.open(io.BytesIO(data))
+    img = ImageOps.exif_transpose(img)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return {name: _fit_to_cell(img, side, quality) for name, (side, quality) in SIZES.items()}
@@ -0,0 +1,157 @@
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import holidays
+
+# =========================================================
+# [연차/근태] 날짜 해석 및 부재 인원 인덱스 (Streamlit 의존성 없음)
+# =========================================================
+APPROVED_STATUS = "최종승인"
+CANONICAL_FMT = "%Y-%m-%d %H:%M"  # 시작일시/종료일시 열 저장 형식
+DATE_FMT = "%Y-%m-%d"
+DAILY_WINDOW_DAYS = 366 * 2  # 일별 인원 배열 범위: 오늘 기준 앞뒤 2년 (먼 연도 오타가 있어도 배열 크기 고정)
+SHORT_LEAVE_DAYS = 31        # 이보다 긴 구간은 따로 보관하여 기간 조회 후보 범위를 좁게 유지
+
+# 시작일시, 종료일시, 반차 여부
+LeavePeriod = namedtuple("LeavePeriod", ["start", "end", "half_day"])
+
+# 지원 형식: "YYYY-MM-DD HH:MM ~ HH:MM", "YYYY-MM-DD HH:MM ~ YYYY-MM-DD HH:MM",
+#           "YYYY-MM-DD ~ YYYY-MM-DD", "YYYY-MM-DD"
+_PERIOD_RE = re.compile(
+    r"^\s*(\d{4})-(\d{1,2})-(\d{1,2})(?:\s+(\d{1,2}):(\d{2}))?"
+    r"\s*(?:~\s*(?:(\d{4})-(\d{1,2})-(\d{1,2}))?\s*(?:(\d{1,2}):(\d{2}))?\s*)?$"
+)
+
+def is_pending_status(status):
+    return "대기" in str(status)
+
+def is_half_day(leave_type):
+    return "반차" in str(leave_type)
+
+@lru_cache(maxsize=8192)
+def parse_leave(date_str, leave_type=""):
+    """'날짜및시간'/'날짜' 문자열 -> LeavePeriod, 해석 불가 시 None"""
+    m = _PERIOD_RE.match(str(date_str))
+    if not m: return None
+    y1, mo1, d1, h1, mi1, y2, mo2, d2, h2, mi2 = m.groups()
+    try:
+        start = datetime(int(y1), int(mo1), int(d1), int(h1 or 0), int(mi1 or 0))
+        if y2: end = datetime(int(y2), int(mo2), int(d2), 23, 59)
+        else: end = start.replace(hour=23, minute=59)
+        if h2: end = end.replace(hour=int(h2), minute=int(mi2))
+    except ValueError: return None
+    # 같은 날 종료 시각이 시작 시각보다 빠른 경우("17:00 ~ 08:00")도 잘못된 입력으로 처리
+    if end < start: return None
+    return LeavePeriod(start, end, is_half_day(leave_type))
+
+def canonical_leave_columns(date_str, leave_type):
+    """근태신청 구조화 열 값 [시작일시, 종료일시, 반일] (해석 불가 시 빈 값)"""
+    period = parse_leave(date_str, leave_type)
+    if not period: return ["", "", ""]
+    return [period.start.strftime(CANONICAL_FMT), period.end.strftime(CANONICAL_FMT), "TRUE" if period.half_day else "FALSE"]
+
+def canonical_schedule_columns(date_str):
+    """일정관리 구조화 열 값 [시작일, 종료일] (해석 불가 시 빈 값)"""
+    period = parse_leave(date_str)
+    if not period: return ["", ""]
+    return [period.start.strftime(DATE_FMT), period.end.strftime(DATE_FMT)]
+
+@lru_cache(maxsize=16)
+def _kr_holidays(first_year, last_year):
+    return holidays.KR(years=range(first_year, last_year + 1))
+
+def row_period(raw, leave_type="", start_val="", end_val="", half_val=""):
+    """구조화 열(시작/종료)이 채워져 있으면 그 값을, 비어 있으면 원문을 해석"""
+    if start_val and end_val:
+        try:
+            start, end = datetime.fromisoformat(start_val), datetime.fromisoformat(end_val)
+            if len(end_val) == 10: end = end.replace(hour=23, minute=59)
+            half = half_val == "TRUE" if half_val else is_half_day(leave_type)
+            return LeavePeriod(start, end, half)
+        except ValueError: pass
+    return parse_leave(raw, leave_type)
+
+def calculate_leave_usage(start, end, half_day):
+    """기간 -> {YYYY-MM: 사용일수} (주말/공휴일 제외, 반차는 시작월 0.5일)"""
+    if start is None or end is None: return {}
+    s_date, e_date = start.date(), end.date()
+    if half_day: return {s_date.strftime("%Y-%m"): 0.5}
+    usage = {}
+    kr_holidays = _kr_holidays(s_date.year, e_date.year)
+    curr = s_date
+    while curr <= e_date:
+        if curr.weekday() < 5 and curr not in kr_holidays:
+            m = curr.strftime("%Y-%m")
+            usage[m] = usage.get(m, 0) + 1.0
+        curr += timedelta(days=1)
+    return usage
+
+class LeaveIndex:
+    """승인/대기 휴가 구간 인덱스
+
+    - 일별 인원: 오늘 기준 앞뒤 2년 범위의 차분 배열(difference array) 누적합 -> 조회 O(1)
+    - 기간 조회: 짧은 구간은 시작일 정렬 + 이분 탐색으로 [조회 시작 - 31일, 조회 종료] 안의 후보만 확인,
+      31일 이상인 긴 구간(드묾)은 따로 모아 확인
+    """
+
+    def __init__(self, entries, today=None):
+        # entries: (row_idx, 이름, 구분, 상태, 시작일, 종료일)
+        self.entries = sorted(entries, key=lambda e: e[4])
+        self.short = [e for e in self.entries if (e[5] - e[4]).days < SHORT_LEAVE_DAYS]
+        self.long = [e for e in self.entries if (e[5] - e[4]).days >= SHORT_LEAVE_DAYS]
+        self.short_starts = [e[4].toordinal() for e in self.short]
+        self.base = (today or date.today()).toordinal() - DAILY_WINDOW_DAYS
+        span = 2 * DAILY_WINDOW_DAYS + 1
+        diff = {"approved": [0] * (span + 1), "pending": [0] * (span + 1)}
+        for e in self.entries:
+            # 범위 밖은 잘라서 반영 (완전히 벗어난 구간은 일별 인원에서 제외)
+            lo = max(e[4].toordinal() - self.base, 0)
+            hi = min(e[5].toordinal() - self.base, span - 1)
+            if lo > hi: continue
+            kind = "approved" if e[3] == APPROVED_STATUS else "pending"
+            diff[kind][lo] += 1
+            diff[kind][hi + 1] -= 1
+        self.daily = {}
+        for kind, arr in diff.items():
+            total, acc = 0, []
+            for v in arr[:-1]:
+                total += v
+                acc.append(total)
+            self.daily[kind] = acc
+
+    @classmethod
+    def from_frame(cls, df):
+        # storage.add_period_columns 로 미리 계산된 기간 열을 사용 (문자열 해석 없음)
+        entries = []
+        if df.empty or '상태' not in df.columns or '기간정상' not in df.columns: return cls(entries)
+        for idx, status, name, l_type, ok, start, end in zip(df.index, df['상태'], df['이름'], df['구분'], df['기간정상'], df['기간시작'], df['기간종료']):
+            if not ok: continue
+            if status != APPROVED_STATUS and not is_pending_status(status): continue
+            entries.append((idx, name, l_type, status, start.date(), end.date()))
+        return cls(entries)
+
+    def headcount(self, day, kind="approved"):
+        pos = day.toordinal() - self.base
+        arr = self.daily[kind]
+        return arr[pos] if 0 <= pos < len(arr) else 0
+
+    def who_is_off(self, start, end=None, exclude=None):
+        end = end or start
+        # 짧은 구간은 종료일 < 시작일 + 31일 이므로, 겹치려면 시작일이 (조회 시작 - 30일) 이후여야 함
+        lo = bisect_left(self.short_starts, start.toordinal() - SHORT_LEAVE_DAYS + 1)
+        hi = bisect_right(self.short_starts, end.toordinal())
+        found = [e for e in self.short[lo:hi] if e[5] >= start]
+        found += [e for e in self.long if e[4] <= end and e[5] >= start]
+        return sorted((e for e in found if e[0] != exclude), key=lambda e: e[4])
+
+    def daily_counts(self, start, end):
+        """기간 내 날짜별 (승인 인원, 대기 인원)"""
+        result = {}
+        day = start
+        while day <= end:
+            result[day] = (self.headcount(day, "approved"), self.headcount(day, "pending"))
+            day += timedelta(days=1)
+        return result
@@ -0,0 +1,340 @@
+"""동시 접속 부하 테스트
+
+Streamlit AppTest 로 app.py 를 세션마다 실행하고, 구글 시트 대신 메모리 내 가짜 백엔드를 사용합니다.
+직원(공지/근무표 열람, 근태신청 제출)과 관리자(결재 승인) 세션을 동시에 돌려
+스크립트 실행 지연(p50/p95), 동작별 API 호출 수, 최대 메모리를 출력합니다.
+Python 할당량(tracemalloc)은 지연 시간을 왜곡하므로 --trace-memory 를 준 실행에서만 측정합니다.
+
+    python loadtest.py --users 20 --iterations 5 --api-latency 150
+"""
+import argparse
+import atexit
+import os
+import random
+import re
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+
+import gspread
+import streamlit as st
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+# 실제 배포의 디스크 스냅샷/공유 캐시에 가짜 데이터가 섞이지 않도록 storage 를 불러오기 전에 격리
+os.environ["SNAPSHOT_DIR"] = tempfile.mkdtemp(prefix="loadtest-snapshots-")
+os.environ["SHARED_CACHE_URL"] = ""
+atexit.register(shutil.rmtree, os.environ["SNAPSHOT_DIR"], ignore_errors=True)
+
+import storage  # noqa: E402
+
+COMPANY_CODE, COMPANY = "9424", "장안 제이유"
+ADMIN_PASSWORD = "loadtest"
+SESSION_KEY = "loadtest_session"  # 세션별 API 호출을 구분하기 위해 session_state 에 넣는 값
+
+# =========================================================
+# [AppTest 전역 상태] AppTest 는 한 번에 한 세션만 실행한다고 가정하므로 실제 서버처럼 프로세스 전역으로 고정
+# - 스크립트: 실행마다 새로 컴파일 -> 한 번만 컴파일 (동시 컴파일 시 일부 Python 3.11 에서 SystemError)
+# - Runtime: 실행마다 새로 만들고 끝나면 지움 -> 다른 세션 실행이 "Runtime hasn't been created" 로 실패하고
+#   st.cache_data 저장소도 실행마다 비워짐 -> 처음 만든 것을 계속 사용
+# - secrets, global.appTest 설정: 실행마다 바꿨다가 되돌림 -> 한 번만 설정 (세션별 at.secrets 는 사용하지 않음)
+# =========================================================
+config.set_option("global.appTest", True)
+
+_script_cache = ScriptCache()
+app_test.ScriptCache = local_script_runner.ScriptCache = lambda: _script_cache
+
+_runtime = []
+
+def _shared_runtime(cls):
+    if not _runtime:
+        if cls._instance is None: raise RuntimeError("Runtime hasn't been created!")
+        _runtime.append(cls._instance)
+    return _runtime[0]
+
+Runtime.instance = classmethod(_shared_runtime)
+Runtime.exists = classmethod(lambda cls: bool(_runtime) or cls._instance is not None)
+
+st.secrets = Secrets()
+st.secrets._secrets = {"admin_password": ADMIN_PASSWORD, "gcp_service_account": {}}
+
+# =========================================================
+# [가짜 백엔드] gspread 워크시트 중 앱이 사용하는 메서드만 구현
+# =========================================================
+class FakeBackend:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.session_calls = Counter()  # 세션 번호 -> 호출 수 (백그라운드 스레드 호출은 None)
+        self.sheets = {}
+
+    def record(self, method):
+        # 스크립트 스레드에서 호출되면 해당 AppTest 세션에 집계 (동시 실행 중인 다른 세션과 섞이지 않음)
+        ctx = get_script_run_ctx(suppress_warning=True)
+        session = ctx.session_state[SESSION_KEY] if ctx and SESSION_KEY in ctx.session_state else None
+        with self.lock:
+            self.calls[method] += 1
+            self.session_calls[session] += 1
+        if self.latency: time.sleep(self.latency)
+
+    def open(self, name):
+        return FakeSpreadsheet(self)
+
+class FakeSpreadsheet:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def worksheet(self, name):
+        self.backend.record("worksheet")
+        if name not in self.backend.sheets: raise gspread.WorksheetNotFound(name)
+        return self.backend.sheets[name]
+
+    def add_worksheet(self, name, rows=100, cols=10):
+        self.backend.record("add_worksheet")
+        return self.backend.sheets.setdefault(name, FakeWorksheet(self.backend, []))
+
+class FakeWorksheet:
+    col_count = 26
+
+    def __init__(self, backend, header, rows=()):
+        self.backend = backend
+        self.values = ([list(header)] if header else []) + [list(r) for r in rows]
+
+    def _pad(self, row_no, col_no):
+        while len(self.values) < row_no: self.values.append([])
+        row = self.values[row_no - 1]
+        while len(row) < col_no: row.append("")
+        return row
+
+    def get_all_values(self):
+        self.backend.record("get_all_values")
+        with self.backend.lock: return [list(r) for r in self.values]
+
+    def get_all_records(self):
+        self.backend.record("get_all_records")
+        with self.backend.lock:
+            if not self.values: return []
+            header = self.values[0]
+            return [{h: (r[i] if i < len(r) else "") for i, h in enumerate(header)} for r in self.values[1:]]
+
+    def get(self, range_name):
+        self.backend.record("get")
+        # "A2:B" 형태만 지원
+        m = re.match(r"([A-Z])(\d+):([A-Z])(\d*)$", range_name)
+        c0, r0, c1 = ord(m.group(1)) - 64, int(m.group(2)), ord(m.group(3)) - 64
+        with self.backend.lock:
+            return [r[c0 - 1:c1] for r in self.values[r0 - 1:]]
+
+    def row_values(self, row_no):
+        self.backend.record("row_values")
+        with self.backend.lock: return list(self.values[row_no - 1]) if row_no <= len(self.values) else []
+
+    def cell(self, row_no, col_no):
+        self.backend.record("cell")
+        with self.backend.lock: return SimpleNamespace(row=row_no, col=col_no, value=self._pad(row_no, col_no)[col_no - 1])
+
+    def find(self, value, in_column=None):
+        self.backend.record("find")
+        with self.backend.lock:
+            for r_no, row in enumerate(self.values, start=1):
+                for c_no, v in enumerate(row, start=1):
+                    if (in_column is None or c_no == in_column) and str(v) == str(value):
+                        return SimpleNamespace(row=r_no, col=c_no, value=v)
+        return None
+
+    def append_row(self, row, **kwargs):
+        self.backend.record("append_row")
+        with self.backend.lock: self.values.append([str(v) for v in row])
+
+    def append_rows(self, rows, **kwargs):
+        self.backend.record("append_rows")
+        with self.backend.lock: self.values.extend([str(v) for v in r] for r in rows)
+
+    def update_cell(self, row_no, col_no, value):
+        self.backend.record("update_cell")
+        with self.backend.lock: self._pad(row_no, col_no)[col_no - 1] = str(value)
+
+    def _write(self, range_name, values):
+        m = re.match(r"([A-Z])(\d+)", range_name)
+        c0, r0 = ord(m.group(1)) - 64, int(m.group(2))
+        with self.backend.lock:
+            for dr, row in enumerate(values):
+                for dc, v in enumerate(row):
+                    self._pad(r0 + dr, c0 + dc)[c0 + dc - 1] = str(v)
+
+    def update(self, range_name=None, values=None, **kwargs):
+        self.backend.record("update")
+        self._write(range_name, values)
+
+    def batch_update(self, data, **kwargs):
+        self.backend.record("batch_update")
+        for item in data: self._write(item["range"], item["values"])
+
+    def add_cols(self, cols):
+        self.backend.record("add_cols")
+
+    def delete_rows(self, start, end=None):
+        self.backend.record("delete_rows")
+        with self.backend.lock: del self.values[start - 1:(end or start)]
+
+def seed_backend(backend, employees, leaves, notices):
+    today = time.strftime("%Y-%m-%d")
+    rnd = random.Random(7)
+    attend = []
+    for n in range(leaves):
+        day = f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+        status = rnd.choice(["최종승인", "최종승인", "1차승인대기", "최종승인대기"])
+        attend.append([COMPANY, today, f"직원{n % employees}", "연차", f"{day} 08:00 ~ {day} 17:00", "개인사유", status, "1234", "JK 조장", ""])
+    backend.sheets = {
+        "근태신청": FakeWorksheet(backend, storage.REQUIRED_COLS["근태신청"], attend),
+        "공지사항": FakeWorksheet(backend, storage.REQUIRED_COLS["공지사항"],
+                              [[COMPANY, today, f"공지 {n}", "내용\n" * 5, "FALSE", "", ""] for n in range(notices)]),
+        "건의사항": FakeWorksheet(backend, storage.REQUIRED_COLS["건의사항"], []),
+        "일정관리": FakeWorksheet(backend, storage.REQUIRED_COLS["일정관리"], [[COMPANY, today, "전체 회의", "", "MASTER"]]),
+        "관리자DB": FakeWorksheet(backend, ["이름", "비밀번호"], []),
+        storage.VERSION_SHEET: FakeWorksheet(backend, ["시트명", "버전"], []),
+    }
+
+# =========================================================
+# [시나리오] 세션 하나 = AppTest 인스턴스 하나
+# =========================================================
+def by_label(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+class Session:
+    def __init__(self, sid, timeout):
+        self.sid = sid
+        self.at = AppTest.from_file("app.py", default_timeout=timeout)
+        self.at.session_state[SESSION_KEY] = sid
+
+    def login(self):
+        self.at.run()
+        by_label(self.at.text_input, "회사 접속 코드").input(COMPANY_CODE)
+        by_label(self.at.button, "로그인").click()
+        self.at.run()
+
+    def open_tab(self, tab):
+        self.at.radio[0].set_value(tab).run()
+
+    def submit_leave(self, n):
+        self.open_tab("📅 근태신청")
+        by_label(self.at.button, "📝 신청서 작성").click().run()
+        by_label(self.at.text_input, "이름").input(f"부하테스트{n}")
+        by_label(self.at.text_input, "비밀번호(본인확인용)").input("1234")
+        by_label(self.at.text_input, "사유").input("부하 테스트")
+        by_label(self.at.button, "신청하기").click().run()
+
+    def master_login(self):
+        self.open_tab("⚙️ 관리자")
+        by_label(self.at.toggle, "🔐 시스템 최고 관리자 (Master) 로그인").set_value(True).run()
+        by_label(self.at.text_input, "Master PW").input(ADMIN_PASSWORD)
+        by_label(self.at.button, "Master Login").click().run()
+
+    def approve_one(self):
+        buttons = [b for b in self.at.button if b.label == "승인"]
+        if buttons: buttons[0].click().run()
+        else: self.at.run()
+
+class Recorder:
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.api_calls = defaultdict(list)
+        self.errors = Counter()
+
+    def timed(self, action, session, fn, *args):
+        calls_before = self.backend.session_calls[session.sid]
+        t0 = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            with self.lock: self.errors[f"{action}: {type(e).__name__}"] += 1
+            return
+        elapsed = time.perf_counter() - t0
+        # 프래그먼트 안의 예외는 AppTest 가 화면 요소로만 남기므로 직접 확인
+        if session.at.exception:
+            message = (session.at.exception[0].message or "").splitlines()
+            with self.lock: self.errors[f"{action}: {message[0][:80] if message else '스크립트 오류'}"] += 1
+            return
+        with self.lock:
+            self.latency[action].append(elapsed)
+            self.api_calls[action].append(self.backend.session_calls[session.sid] - calls_before)
+
+def employee(rec, n, iterations, timeout):
+    s = Session(f"직원{n}", timeout)
+    rec.timed("로그인", s, s.login)
+    for i in range(iterations):
+        rec.timed("📋 공지 열람", s, s.open_tab, "📋 공지")
+        rec.timed("📆 근무표 열람", s, s.open_tab, "📆 근무표")
+        if i % 2 == 0: rec.timed("근태신청 제출", s, s.submit_leave, n)
+
+def manager(rec, n, iterations, timeout):
+    s = Session(f"관리자{n}", timeout)
+    rec.timed("로그인", s, s.login)
+    rec.timed("관리자 로그인", s, s.master_login)
+    for _ in range(iterations):
+        rec.timed("✅ 결재 승인", s, s.approve_one)
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="사내광장 동시 접속 부하 테스트 (가짜 시트 백엔드)")
+    parser.add_argument("--users", type=int, default=10, help="동시 직원 세션 수")
+    parser.add_argument("--managers", type=int, default=1, help="동시 관리자 세션 수")
+    parser.add_argument("--iterations", type=int, default=3, help="세션당 반복 횟수")
+    parser.add_argument("--api-latency", type=float, default=0, help="가짜 API 호출당 지연(ms)")
+    parser.add_argument("--leaves", type=int, default=2000, help="초기 근태신청 행 수")
+    parser.add_argument("--notices", type=int, default=50, help="초기 공지 행 수")
+    parser.add_argument("--timeout", type=float, default=60, help="스크립트 1회 실행 제한 시간(초)")
+    parser.add_argument("--trace-memory", action="store_true", help="Python 할당 최대치 측정 (지연 수치는 신뢰할 수 없음)")
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.api_latency / 1000)
+    seed_backend(backend, args.users, args.leaves, args.notices)
+    storage.get_client = lambda: backend  # 앱과 CLI가 사용하는 접속 지점 교체
+
+    rec = Recorder(backend)
+    if args.trace_memory: tracemalloc.start()
+    threads = [threading.Thread(target=employee, args=(rec, n, args.iterations, args.timeout)) for n in range(args.users)]
+    threads += [threading.Thread(target=manager, args=(rec, n, args.iterations, args.timeout)) for n in range(args.managers)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - t0
+    if args.trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    actions = sum(len(v) for v in rec.latency.values())
+    total_calls = sum(backend.calls.values())
+    print(f"\n세션 {len(threads)}개, 동작 {actions}회, 소요 {elapsed:.1f}초")
+    if args.trace_memory: print("(--trace-memory 실행: 지연 시간은 tracemalloc 부하를 포함)")
+    print(f"{'동작':<16}{'횟수':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'API 평균':>10}{'API 최대':>10}")
+    for action, vals in rec.latency.items():
+        calls = rec.api_calls[action]
+        print(f"{action:<16}{len(vals):>6}{percentile(vals, 50) * 1000:>10.0f}{percentile(vals, 95) * 1000:>10.0f}"
+              f"{sum(calls) / len(calls):>10.2f}{max(calls):>10}")
+    print(f"\nAPI 호출 {total_calls}회 (분당 {total_calls / elapsed * 60:.0f}회, 백그라운드 스레드 {backend.session_calls[None]}회)")
+    for method, count in backend.calls.most_common(): print(f"  {method}: {count}")
+    memory = f"RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB"
+    if args.trace_memory: memory = f"Python 할당 {peak / 2**20:.1f} MiB, " + memory
+    print(f"\n최대 메모리: {memory}")
+    if rec.errors:
+        print("\n오류:")
+        for err, count in rec.errors.most_common(): print(f"  {err}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import io
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# =========================================================
+# [공유 캐시] 여러 앱 프로세스(레플리카)가 함께 쓰는 캐시 계층
+# - 버전표: 쓰기 시 갱신되는 시트별 버전 (무효화 알림 역할)
+# - 데이터: (시트명, 버전) 별로 내려받은 프레임을 Parquet 바이트로 저장해 다른 레플리카가 재사용
+#   (공유 파일을 쓸 수 있는 누구라도 코드를 실행할 수 있으므로 pickle 은 사용하지 않음, pyarrow 필요)
+# SHARED_CACHE_URL 로 선택:  "" (사용 안 함) | "sqlite:///경로/shared_cache.db"
+# =========================================================
+class NullSharedCache:
+    enabled = False
+
+    def get_versions(self): return {}
+    def set_version(self, sheet_name, stamp): pass
+    def get_frame(self, sheet_name, version, max_age=None): return None
+    def put_frame(self, sheet_name, version, df): pass
+
+class SQLiteSharedCache:
+    """같은 호스트(또는 공유 볼륨)의 레플리카용 로컬 대체 구현"""
+    enabled = True
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (sheet TEXT PRIMARY KEY, stamp TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS frames (sheet TEXT, version TEXT, data BLOB, saved REAL, PRIMARY KEY (sheet, version))")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn: yield conn
+        finally: conn.close()
+
+    def get_versions(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT sheet, stamp FROM versions").fetchall())
+
+    def set_version(self, sheet_name, stamp):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO versions (sheet, stamp) VALUES (?, ?) ON CONFLICT(sheet) DO UPDATE SET stamp = excluded.stamp "
+                         "WHERE CAST(excluded.stamp AS INTEGER) > CAST(versions.stamp AS INTEGER)", (sheet_name, str(stamp)))
+
+    def get_frame(self, sheet_name, version, max_age=None):
+        # max_age: 그보다 오래전에 저장된 프레임은 없는 것으로 취급
+        if not HAS_PARQUET: return None
+        oldest = time.time() - max_age if max_age is not None else 0
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM frames WHERE sheet = ? AND version = ? AND saved >= ?", (sheet_name, version, oldest)).fetchone()
+        if not row: return None
+        # 읽을 수 없는 값(이전 형식 등)은 없는 것으로 보고 다시 받음
+        try: return pd.read_parquet(io.BytesIO(row[0]))
+        except (OSError, ValueError): return None
+
+    def put_frame(self, sheet_name, version, df):
+        if not HAS_PARQUET: return
+        buffer = io.BytesIO()
+        df.to_parquet(buffer)
+        data = buffer.getvalue()
+        with self._connect() as conn:
+            # 이전 버전은 다시 쓰이지 않으므로 함께 정리
+            conn.execute("DELETE FROM frames WHERE sheet = ? AND version != ?", (sheet_name, version))
+            conn.execute("INSERT OR REPLACE INTO frames (sheet, version, data, saved) VALUES (?, ?, ?, ?)", (sheet_name, version, data, time.time()))
+
+def open_shared_cache(url=None):
+    url = os.environ.get("SHARED_CACHE_URL", "") if url is None else url
+    if not url: return NullSharedCache()
+    if url.startswith("sqlite:///"): return SQLiteSharedCache(url[len("sqlite:///"):])
+    raise ValueError(f"지원하지 않는 SHARED_CACHE_URL: {url}")
+
+def newest_versions(*tables):
+    """여러 버전표를 합쳐 시트별로 가장 최근 스탬프를 선택 (스탬프는 time_ns 문자열)"""
+    merged = {}
+    for table in tables:
+        for sheet_name, stamp in table.items():
+            current = merged.get(sheet_name)
+            try: newer = current is None or int(stamp) > int(current)
+            except ValueError: newer = current is None
+            if newer: merged[sheet_name] = stamp
+    return merged
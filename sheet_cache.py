@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# =========================================================
+# [시트 캐시] 프로세스당 하나, 모든 세션이 같은 DataFrame 을 공유 (복사/피클링 없음)
+# - 키: (시트명, 버전) / 값: 회사별 DataFrame 묶음
+# - 메모리 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+# - max_age 를 주면 그보다 오래전에 받은 항목은 버전이 같아도 다시 받음 (시트에서 직접 고친 내용 반영)
+# - 같은 키를 여러 세션이 동시에 요청하면 한 번만 내려받음
+# =========================================================
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = None
+
+def to_shared_frame(df):
+    """문자열 열을 Arrow 기반으로 변환 (파이썬 str 객체 대비 메모리 절약)"""
+    if STRING_DTYPE is None or df.empty: return df
+    return df.astype({c: STRING_DTYPE for c in df.columns if df[c].dtype == object})
+
+EMPTY_VIEW = ("빈 프레임",)  # 해당 회사 행이 없을 때 돌려줄 열 구조만 있는 프레임
+
+def split_by_company(df):
+    """소속 열 기준으로 한 번만 나눠 둠 (소속 열이 없는 시트는 None 키에 전체 저장)"""
+    if '소속' not in df.columns: return {None: df}
+    views = {company: frame for company, frame in df.groupby('소속', sort=False)}
+    views[EMPTY_VIEW] = df.iloc[0:0]
+    return views
+
+def company_view(views, company_name):
+    if None in views: return views[None]
+    return views.get(company_name.strip(), views[EMPTY_VIEW])
+
+def frame_nbytes(views):
+    return int(sum(f.memory_usage(deep=True).sum() for f in views.values()))
+
+class SheetCache:
+    def __init__(self, budget_bytes):
+        self.budget = budget_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (시트명, 버전) -> (회사별 프레임, 바이트 수, 받은 시각)
+        self.loading = {}             # (시트명, 버전) -> threading.Event
+        self.nbytes = 0
+
+    def get(self, key, max_age=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None: return None
+            if max_age is not None and time.time() - entry[2] > max_age: return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def loaded_at(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[2] if entry else None
+
+    def put(self, key, views, loaded_at=None):
+        size = frame_nbytes(views)
+        with self.lock:
+            # 같은 시트의 이전 버전은 다시 쓰이지 않으므로 바로 제거
+            for old in [k for k in self.entries if k[0] == key[0] and k != key]:
+                self.nbytes -= self.entries.pop(old)[1]
+            if key in self.entries: self.nbytes -= self.entries.pop(key)[1]
+            self.entries[key] = (views, size, time.time() if loaded_at is None else loaded_at)
+            self.nbytes += size
+            while self.nbytes > self.budget and len(self.entries) > 1:
+                _, (_, old_size, _) = self.entries.popitem(last=False)
+                self.nbytes -= old_size
+
+    def get_or_load(self, key, loader, max_age=None):
+        """캐시에 없거나 max_age 를 넘었으면 loader() 로 시트 전체 프레임을 받아 회사별로 나눠 저장"""
+        while True:
+            views = self.get(key, max_age)
+            if views is not None: return views
+            with self.lock:
+                event = self.loading.get(key)
+                if event is None:
+                    event = self.loading[key] = threading.Event()
+                    owner = True
+                else: owner = False
+            if not owner:
+                event.wait()
+                continue
+            try:
+                views = split_by_company(to_shared_frame(loader()))
+                self.put(key, views)
+                return views
+            finally:
+                with self.lock: self.loading.pop(key, None)
+                event.set()
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.nbytes, "budget": self.budget}
+
+# =========================================================
+# [디스크 스냅샷] 재시작 직후 시트 API 호출 없이 바로 응답하기 위한 Parquet 사본
+# - 시트마다 {시트명}.parquet + {시트명}.json (버전, 저장 시각)
+# - pyarrow 가 없으면 사용하지 않음
+# =========================================================
+_snapshot_lock = threading.Lock()
+
+def save_snapshot(directory, sheet_name, version, df):
+    if STRING_DTYPE is None: return
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, sheet_name)
+    tmp = f"{base}.{os.getpid()}.tmp"
+    # 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+    # 프로세스 안에서는 한 번에 하나씩 저장 (같은 임시 파일 충돌, 데이터/버전 파일 엇갈림 방지)
+    with _snapshot_lock:
+        df.to_parquet(tmp)
+        os.replace(tmp, base + ".parquet")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "saved": time.time()}, f)
+        os.replace(tmp, base + ".json")
+
+def load_snapshots(directory, sheet_names):
+    """(시트명, 버전, 저장 시각, DataFrame) 목록 - 손상되었거나 없는 스냅샷은 건너뜀"""
+    if STRING_DTYPE is None: return []
+    result = []
+    for sheet_name in sheet_names:
+        base = os.path.join(directory, sheet_name)
+        try:
+            with open(base + ".json", encoding="utf-8") as f: meta = json.load(f)
+            result.append((sheet_name, meta["version"], meta["saved"], pd.read_parquet(base + ".parquet")))
+        except (OSError, ValueError, KeyError): continue
+        except Exception as e: print(f"스냅샷 읽기 오류({sheet_name}): {e}")
+    return result
@@ -0,0 +1,475 @@
+import streamlit as st
+import pandas as pd
+import gspread
+from gspread.utils import rowcol_to_a1
+from oauth2client.service_account import ServiceAccountCredentials
+from datetime import datetime
+import uuid
+import pytz
+import time as tm
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from image_pipeline import process_image
+from leave import LeaveIndex, row_period, canonical_leave_columns, canonical_schedule_columns
+from sheet_cache import SheetCache, company_view, split_by_company, to_shared_frame, save_snapshot, load_snapshots
+from shared_cache import open_shared_cache, newest_versions
+import os
+import hashlib
+import hmac
+import secrets
+
+# =========================================================
+# [데이터 계층] 앱(app.py)과 명령줄 도구(cli.py)가 함께 사용하는 저장소 함수
+# =========================================================
+KST = pytz.timezone('Asia/Seoul')
+
+# =========================================================
+# [설정] 관리자 및 회사 정보
+# =========================================================
+JANGAN_FOREMEN = ["승인 담당자를 선택 해주세요.", "JK 조장", "JX 메인 조장", "JX 어퍼 조장", "MX5 조장", "피더 조장"]
+JANGAN_MID = ["반장"]
+ULSAN_APPROVERS = ["승인 담당자를 선택 해주세요.", "김범진", "남수영", "홍성곤"]
+ALL_MANAGERS = JANGAN_FOREMEN + JANGAN_MID + ULSAN_APPROVERS + ["MASTER"]
+
+COMPANIES = {
+    "9424": "장안 제이유",
+    "0645": "울산 제이유"
+}
+
+# =========================================================
+# [함수] 데이터 처리
+# =========================================================
+def get_client():
+    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+    creds_dict = st.secrets["gcp_service_account"]
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    client = gspread.authorize(creds)
+    return client
+
+def get_worksheet(sheet_name):
+    client = get_client()
+    return client.open("사내공지사항DB").worksheet(sheet_name)
+
+def get_today():
+    return datetime.now(KST).strftime("%Y-%m-%d")
+
+# [버전 스탬프] 쓰기마다 시트별 버전을 갱신하고, 읽기는 버전이 바뀐 경우에만 전체 데이터를 다시 받음
+VERSION_SHEET = "버전관리"  # 열: 시트명, 버전
+VERSION_POLL_SEC = 10
+# 버전이 그대로여도 이 시간(초)이 지난 캐시는 다시 받음 (버전을 갱신하지 않는 시트 직접 수정 반영)
+SHEET_MAX_AGE_SEC = int(os.environ.get("SHEET_MAX_AGE_SEC", "300"))
+
+@st.cache_resource
+def get_shared_cache():
+    # 여러 레플리카 운영 시 SHARED_CACHE_URL 지정 (미지정 시 프로세스 내 캐시만 사용)
+    return open_shared_cache()
+
+@st.cache_data(ttl=5)
+def _load_version_sheet():
+    # 작은 시트 한 번 조회 (프로세스 내 모든 세션이 5초 캐시를 공유)
+    try:
+        rows = get_worksheet(VERSION_SHEET).get_all_values()[1:]
+        # 처음 기록이 동시에 일어나면 같은 시트 행이 둘 생길 수 있음 (mark_changed 는 첫 행만 갱신) -> 가장 큰 스탬프 사용
+        return newest_versions(*({r[0]: r[1]} for r in rows if len(r) >= 2))
+    except: return {}
+
+@st.cache_data(ttl=2)
+def _load_shared_versions():
+    # 공유 캐시의 버전표는 짧게(2초) 캐시 - 항목마다 load_data 를 불러도 접속은 2초에 한 번
+    try: return get_shared_cache().get_versions()
+    except Exception as e:
+        print(f"공유 캐시 조회 오류: {e}")
+        return {}
+
+def get_sheet_versions():
+    return newest_versions(_load_version_sheet(), _load_shared_versions())
+
+def refresh_sheet_versions():
+    _load_version_sheet.clear()
+    _load_shared_versions.clear()
+
+def current_sheet_version(sheet_name):
+    version = get_sheet_versions().get(sheet_name, "")
+    # 버전관리 시트가 없으면 기존처럼 5분 단위로 갱신
+    return version or f"ttl-{int(tm.time() // 300)}"
+
+def get_sheet_version(sheet_name):
+    # 재시작 직후에는 확인이 끝날 때까지 디스크 스냅샷의 버전을 그대로 사용
+    return _provisional_versions.get(sheet_name) or current_sheet_version(sheet_name)
+
+def mark_changed(sheet_name):
+    stamp = str(tm.time_ns())
+    try:
+        try: sheet = get_worksheet(VERSION_SHEET)
+        except gspread.WorksheetNotFound:
+            sheet = get_client().open("사내공지사항DB").add_worksheet(VERSION_SHEET, rows=20, cols=2)
+            sheet.append_row(["시트명", "버전"])
+        cell = sheet.find(sheet_name, in_column=1)
+        if cell: sheet.update_cell(cell.row, 2, stamp)
+        else: sheet.append_row([sheet_name, stamp])
+    except Exception as e: print(f"버전 갱신 오류({sheet_name}): {e}")
+    try: get_shared_cache().set_version(sheet_name, stamp)
+    except Exception as e: print(f"공유 캐시 버전 갱신 오류({sheet_name}): {e}")
+    refresh_sheet_versions()
+
+# [관리자 계정] 이름 -> {행번호, 저장된 비밀번호} 인덱스 (조회 시에는 해시 계산 없음)
+PW_HASH_PREFIX = "pbkdf2_sha256"
+PW_HASH_ITERATIONS = 120000
+
+def hash_password(password, salt=None):
+    if salt is None: salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", str(password).encode(), bytes.fromhex(salt), PW_HASH_ITERATIONS)
+    return f"{PW_HASH_PREFIX}${PW_HASH_ITERATIONS}${salt}${digest.hex()}"
+
+def verify_password(stored, password):
+    stored = str(stored)
+    if not stored.startswith(PW_HASH_PREFIX + "$"):
+        # 기존 평문 저장분 (로그인 성공 시 해시로 교체됨) - 한글 비교를 위해 바이트로 비교
+        return hmac.compare_digest(stored.encode(), str(password).encode())
+    try:
+        _, iterations, salt, digest = stored.split("$")
+        check = hashlib.pbkdf2_hmac("sha256", str(password).encode(), bytes.fromhex(salt), int(iterations))
+        return hmac.compare_digest(check.hex(), digest)
+    except: return False
+
+def is_legacy_password(stored):
+    return not str(stored).startswith(PW_HASH_PREFIX + "$")
+
+def load_user_db():
+    return _load_user_db(get_sheet_version("관리자DB"))
+
+@st.cache_data(ttl=SHEET_MAX_AGE_SEC, max_entries=4)
+def _load_user_db(version):
+    try:
+        sheet = get_worksheet("관리자DB")
+        data = sheet.get_all_records()
+        # 헤더가 1행이므로 데이터는 2행부터 시작
+        return {str(row['이름']).strip(): {"row": i + 2, "pw": str(row['비밀번호']).strip()} for i, row in enumerate(data)}
+    except: return {}
+
+def _manager_row(sheet, name):
+    # 캐시된 행 번호는 다른 곳의 삭제/직접 수정으로 밀렸을 수 있으므로 그 행의 이름을 확인하고, 다르면 시트에서 다시 찾음
+    name = str(name).strip()
+    entry = load_user_db().get(name)
+    if entry:
+        current = sheet.row_values(entry['row'])
+        if current and str(current[0]).strip() == name: return entry['row']
+    cell = sheet.find(name, in_column=1)
+    return cell.row if cell else None
+
+def upsert_manager(name, password):
+    try:
+        sheet = get_worksheet("관리자DB")
+        stored = hash_password(password)
+        row = _manager_row(sheet, name)
+        if row:
+            sheet.update(range_name=f"A{row}:B{row}", values=[[name, stored]])
+        else:
+            if not sheet.row_values(1): sheet.append_row(["이름", "비밀번호"])
+            sheet.append_row([name, stored])
+    except Exception as e: st.error(f"저장 오류: {e}")
+    mark_changed("관리자DB")
+
+def delete_manager(name):
+    try:
+        sheet = get_worksheet("관리자DB")
+        row = _manager_row(sheet, name)
+        if row: sheet.delete_rows(row)
+    except Exception as e: st.error(f"삭제 오류: {e}")
+    mark_changed("관리자DB")
+
+# [이미지 처리 함수] 디코딩/리사이즈/인코딩은 프로세스 풀에서, 시트 저장은 백그라운드 스레드에서 수행
+ATTACH_SHEET = "첨부이미지"  # 열: 첨부ID, 썸네일, 원본
+
+@st.cache_resource
+def get_image_pool():
+    return ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+
+def get_attach_worksheet():
+    try: return get_worksheet(ATTACH_SHEET)
+    except gspread.WorksheetNotFound:
+        sheet = get_client().open("사내공지사항DB").add_worksheet(ATTACH_SHEET, rows=100, cols=3)
+        sheet.append_row(["첨부ID", "썸네일", "원본"])
+        return sheet
+
+def _store_attachments(jobs):
+    rows = []
+    for att_id, future in jobs:
+        try:
+            result = future.result()
+            rows.append([att_id, result["thumb"], result["full"]])
+        except Exception as e: print(f"이미지 처리 오류({att_id}): {e}")
+    try:
+        if rows: get_attach_worksheet().append_rows(rows)
+    except Exception as e: print(f"이미지 저장 오류: {e}")
+    if rows: mark_changed(ATTACH_SHEET)
+
+def submit_images(image_files):
+    """업로드 파일들을 풀에 넘기고 첨부ID 목록을 즉시 반환 (저장은 백그라운드)"""
+    if not image_files: return []
+    pool = get_image_pool()
+    jobs = []
+    for f in image_files:
+        att_id = uuid.uuid4().hex[:12]
+        jobs.append((att_id, pool.submit(process_image, f.getvalue())))
+    threading.Thread(target=_store_attachments, args=(jobs,), daemon=True).start()
+    return [att_id for att_id, _ in jobs]
+
+def load_thumbnails():
+    # 시트 프레임과 같은 프로세스 공유 캐시에 보관 (세션/항목마다 복사하거나 언피클하지 않음)
+    # 반환값: 첨부ID -> 썸네일(base64) Series (읽기 전용)
+    try:
+        views = get_sheet_cache().get_or_load((ATTACH_SHEET, get_sheet_version(ATTACH_SHEET)), _fetch_thumbnails)
+        return company_view(views, "")['썸네일']
+    except: return pd.Series(dtype=object)
+
+def _fetch_thumbnails():
+    # 목록 화면은 썸네일 열(A:B)만 내려받음
+    rows = get_attach_worksheet().get("A2:B")
+    return pd.DataFrame([r[:2] for r in rows if len(r) >= 2], columns=["첨부ID", "썸네일"]).set_index("첨부ID")
+
+def load_full_image(att_id):
+    # 아직 저장되지 않은 첨부(처리 중)는 캐시하지 않고 다음 요청에서 다시 조회
+    try: return _load_full_image(att_id)
+    except: return ""
+
+@st.cache_data(ttl=3600, max_entries=50)
+def _load_full_image(att_id):
+    # 원본은 요청 시 해당 셀만 조회 (첨부는 수정되지 않으므로 길게 캐시)
+    sheet = get_attach_worksheet()
+    cell = sheet.find(att_id, in_column=1)
+    if not cell: raise LookupError(att_id)
+    return sheet.cell(cell.row, 3).value
+
+# 시트별 열 순서 (시트 헤더 순서와 동일해야 함)
+REQUIRED_COLS = {
+    "근태신청": ['소속', '신청일', '이름', '구분', '날짜및시간', '사유', '상태', '비밀번호', '승인담당자', '반려사유', '시작일시', '종료일시', '반일'],
+    "공지사항": ['소속', '작성일', '제목', '내용', '중요', '이미지데이터', '첨부'], 
+    "건의사항": ['소속', '작성일', '제목', '내용', '작성자', '비공개', '비밀번호'],
+    "일정관리": ['소속', '날짜', '제목', '내용', '작성자', '시작일', '종료일']
+}
+
+# 자유 형식 날짜 원문 -> 구조화 열 (쓰기 시 함께 저장, 기존 행은 migrate_canonical_columns 로 채움)
+CANONICAL_COLS = {
+    "근태신청": ("날짜및시간", ['시작일시', '종료일시', '반일']),
+    "일정관리": ("날짜", ['시작일', '종료일']),
+}
+
+def canonical_values(sheet_name, date_str, leave_type=""):
+    if sheet_name == "근태신청": return canonical_leave_columns(date_str, leave_type)
+    return canonical_schedule_columns(date_str)
+
+_checked_headers = set()
+
+def ensure_columns(sheet, sheet_name):
+    # 새 열이 추가된 시트는 헤더를 한 번만 보완 (헤더가 비면 get_all_records 가 열을 잃음)
+    if sheet_name in _checked_headers: return
+    cols = REQUIRED_COLS[sheet_name]
+    header = sheet.row_values(1)
+    if len(header) < len(cols) and header == cols[:len(header)]:
+        if sheet.col_count < len(cols): sheet.add_cols(len(cols) - sheet.col_count)
+        sheet.update(range_name="A1", values=[cols])
+    elif header[:len(cols)] != cols:
+        print(f"{sheet_name} 헤더가 예상과 다릅니다: {header}")
+    _checked_headers.add(sheet_name)
+
+def add_period_columns(sheet_name, df):
+    """기간시작/기간종료/반일여부/기간정상 열 추가 (버전당 한 번, 화면에서는 문자열 해석 없음)"""
+    if sheet_name not in CANONICAL_COLS or '기간정상' in df.columns or CANONICAL_COLS[sheet_name][0] not in df.columns: return df
+    raw_col, cols = CANONICAL_COLS[sheet_name]
+    types = df['구분'] if '구분' in df.columns else [""] * len(df)
+    halves = df[cols[2]] if len(cols) > 2 else [""] * len(df)
+    periods = [row_period(raw, l_type, s_val, e_val, h_val)
+               for raw, l_type, s_val, e_val, h_val in zip(df[raw_col], types, df[cols[0]], df[cols[1]], halves)]
+    failed = sum(p is None for p in periods)
+    if failed: print(f"{sheet_name} 날짜 해석 실패 {failed}건")
+    return df.assign(
+        기간시작=pd.to_datetime([p.start if p else None for p in periods]),
+        기간종료=pd.to_datetime([p.end if p else None for p in periods]),
+        반일여부=[bool(p and p.half_day) for p in periods],
+        기간정상=[p is not None for p in periods],
+    )
+
+def migrate_canonical_columns(sheet_name):
+    """기존 행의 구조화 열을 한 번에 채움 -> (채운 행 수, [(시트 행 번호, 원문)] 해석 실패 목록)"""
+    raw_col, cols = CANONICAL_COLS[sheet_name]
+    sheet = get_worksheet(sheet_name)
+    ensure_columns(sheet, sheet_name)
+    df = fetch_sheet_frame(sheet_name)
+    if df.empty: return 0, []
+    values, filled, failed = [], 0, []
+    for idx, row in df.iterrows():
+        current = [row[c] for c in cols]
+        if all(current):
+            values.append(current); continue
+        new = canonical_values(sheet_name, row[raw_col], row.get('구분', ""))
+        if new[0]: filled += 1
+        else: failed.append((idx + 2, row[raw_col]))
+        values.append(new)
+    first = REQUIRED_COLS[sheet_name].index(cols[0]) + 1
+    if filled:
+        sheet.update(range_name=f"{rowcol_to_a1(2, first)}:{rowcol_to_a1(len(values) + 1, first + len(cols) - 1)}", values=values)
+        mark_changed(sheet_name)
+    return filled, failed
+
+def normalize_columns(sheet_name, df):
+    # 열이 추가되기 전에 저장된 프레임(헤더가 짧은 시트, 이전 스냅샷/공유 캐시)도 같은 열 구성으로 맞춤
+    if sheet_name not in REQUIRED_COLS: return df
+    missing = [col for col in REQUIRED_COLS[sheet_name] if col not in df.columns]
+    return df.assign(**{col: "" for col in missing}) if missing else df
+
+def fetch_sheet_frame(sheet_name):
+    # 시트 전체를 내려받아 문자열로 정리 (회사 구분 없음)
+    sheet = get_worksheet(sheet_name)
+    data = sheet.get_all_records()
+    df = pd.DataFrame(data)
+
+    if df.empty and sheet_name in REQUIRED_COLS: 
+        df = pd.DataFrame(columns=REQUIRED_COLS[sheet_name])
+
+    df = normalize_columns(sheet_name, df)
+    df = df.astype(str)
+    for col in df.columns:
+        if df[col].dtype == object: df[col] = df[col].str.strip()
+    return df
+
+def fetch_shared_frame(sheet_name, version):
+    # 다른 레플리카가 최근(SHEET_MAX_AGE_SEC 이내)에 받아 둔 같은 버전이 있으면 시트 API 호출 없이 사용
+    shared = get_shared_cache()
+    df = None
+    try: df = shared.get_frame(sheet_name, version, max_age=SHEET_MAX_AGE_SEC)
+    except Exception as e: print(f"공유 캐시 조회 오류({sheet_name}): {e}")
+    if df is not None: df = normalize_columns(sheet_name, df)
+    else:
+        df = fetch_sheet_frame(sheet_name)
+        try: shared.put_frame(sheet_name, version, df)
+        except Exception as e: print(f"공유 캐시 저장 오류({sheet_name}): {e}")
+    try: save_snapshot(SNAPSHOT_DIR, sheet_name, version, df)
+    except Exception as e: print(f"스냅샷 저장 오류({sheet_name}): {e}")
+    return df
+
+SHEET_CACHE_MB = int(os.environ.get("SHEET_CACHE_MB", "256"))
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(".cache", "snapshots"))
+_provisional_versions = {}  # 시트명 -> 아직 확인하지 않은 스냅샷 버전
+
+@st.cache_resource
+def get_sheet_cache():
+    cache = SheetCache(SHEET_CACHE_MB * 2**20)
+    # 프로세스 시작 시 한 번: 스냅샷을 바로 올리고, 실제 버전 확인은 백그라운드에서 진행
+    for sheet_name, version, saved, df in load_snapshots(SNAPSHOT_DIR, REQUIRED_COLS):
+        df = add_period_columns(sheet_name, normalize_columns(sheet_name, df))
+        cache.put((sheet_name, version), split_by_company(to_shared_frame(df)), loaded_at=saved)
+        _provisional_versions[sheet_name] = version
+    if _provisional_versions:
+        threading.Thread(target=_revalidate_snapshots, args=(cache,), daemon=True).start()
+    return cache
+
+def _revalidate_snapshots(cache):
+    for sheet_name, version in list(_provisional_versions.items()):
+        try:
+            # 버전이 바뀌었거나 스냅샷이 SHEET_MAX_AGE_SEC 보다 오래되었으면 다시 받음
+            current = current_sheet_version(sheet_name)
+            cache.get_or_load((sheet_name, current), lambda: add_period_columns(sheet_name, fetch_shared_frame(sheet_name, current)), SHEET_MAX_AGE_SEC)
+        except Exception as e: print(f"스냅샷 확인 오류({sheet_name}): {e}")
+        _provisional_versions.pop(sheet_name, None)
+
+def load_sheet_views(sheet_name):
+    """(캐시 키, 회사별 프레임) - 스냅샷 확인 중에는 기간과 관계없이 스냅샷을 그대로 사용"""
+    key = (sheet_name, get_sheet_version(sheet_name))
+    max_age = None if sheet_name in _provisional_versions else SHEET_MAX_AGE_SEC
+    return key, get_sheet_cache().get_or_load(key, lambda: add_period_columns(sheet_name, fetch_shared_frame(*key)), max_age)
+
+def load_data(sheet_name, company_name):
+    # 반환되는 프레임은 모든 세션이 공유하므로 수정하지 말 것 (필터링/복사 후 사용)
+    try:
+        _, views = load_sheet_views(sheet_name)
+        return company_view(views, company_name)
+    except: return pd.DataFrame()
+
+def save_notice(company, title, content, is_important, image_files=None):
+    sheet = get_worksheet("공지사항")
+    ensure_columns(sheet, "공지사항")  # 첨부 열 헤더가 없으면 get_all_records 가 첨부ID를 버림
+    att_ids = submit_images(image_files)
+    sheet.append_row([company, get_today(), title, content, "TRUE" if is_important else "FALSE", "", ",".join(att_ids)])
+    mark_changed("공지사항")
+
+def save_suggestion(company, title, content, author, is_private, password):
+    sheet = get_worksheet("건의사항")
+    sheet.append_row([company, get_today(), title, content, author, "TRUE" if is_private else "FALSE", str(password)])
+    mark_changed("건의사항")
+
+def initial_attendance_status(company, approver):
+    if company == "장안 제이유":
+        if approver == "MASTER": return "최종승인대기" 
+        elif approver in JANGAN_FOREMEN: return "1차승인대기"
+        else: return "2차승인대기"
+    return "승인대기"
+
+def save_attendance(company, name, type_val, date_range_str, reason, password, approver):
+    sheet = get_worksheet("근태신청")
+    ensure_columns(sheet, "근태신청")
+    initial_status = initial_attendance_status(company, approver)
+    sheet.append_row([company, get_today(), name, type_val, date_range_str, reason, initial_status, str(password), approver, ""]
+                     + canonical_values("근태신청", date_range_str, type_val))
+    mark_changed("근태신청")
+
+def save_schedule(company, date_str, title, content, author):
+    sheet = get_worksheet("일정관리")
+    ensure_columns(sheet, "일정관리")
+    sheet.append_row([company, date_str, title, content, author] + canonical_values("일정관리", date_str))
+    mark_changed("일정관리")
+
+def update_attendance_step(sheet_name, row_idx, new_status, next_approver=None, reject_reason=None):
+    sheet = get_worksheet(sheet_name)
+    sheet.update_cell(row_idx + 2, 7, new_status)
+    if next_approver: sheet.update_cell(row_idx + 2, 9, next_approver)
+    if reject_reason: sheet.update_cell(row_idx + 2, 10, reject_reason)
+    mark_changed(sheet_name)
+
+def apply_sheet_edits(sheet_name, original, edited, deleted=()):
+    """편집 전/후 프레임을 비교해 바뀐 셀만 한 번의 batch_update 로 기록
+
+    - original/edited: 시트 열 이름을 가진 프레임 (인덱스 = 시트 행 번호 - 2)
+    - deleted: 삭제할 행 인덱스 (행 번호가 밀리지 않도록 아래쪽부터 삭제)
+    반환값: (수정한 셀 수, 삭제한 행 수)
+    """
+    cols = REQUIRED_COLS[sheet_name]
+    updates = []
+    skip = set(deleted)
+    common = [i for i in edited.index if i in original.index and i not in skip]
+    for col in edited.columns:
+        if col not in cols: continue
+        before = original.loc[common, col].astype(str)
+        after = edited.loc[common, col].fillna("").astype(str)
+        for row_idx in before.index[before != after]:
+            updates.append({"range": rowcol_to_a1(row_idx + 2, cols.index(col) + 1), "values": [[after[row_idx]]]})
+    # 날짜 원문이 바뀐 행은 구조화 열도 함께 갱신
+    if sheet_name in CANONICAL_COLS and CANONICAL_COLS[sheet_name][0] in edited.columns:
+        raw_col, canon_cols = CANONICAL_COLS[sheet_name]
+        for row_idx in common:
+            if str(original.at[row_idx, raw_col]) == str(edited.at[row_idx, raw_col]): continue
+            new = canonical_values(sheet_name, edited.at[row_idx, raw_col], original.get('구분', {}).get(row_idx, ""))
+            for col, value in zip(canon_cols, new):
+                updates.append({"range": rowcol_to_a1(row_idx + 2, cols.index(col) + 1), "values": [[value]]})
+    if not updates and not deleted: return 0, 0
+
+    sheet = get_worksheet(sheet_name)
+    # 구조화 열이 아직 없는 시트면 범위 밖 셀에 기록하게 되므로 헤더부터 확인
+    if updates: ensure_columns(sheet, sheet_name); sheet.batch_update(updates)
+    for row_idx in sorted(deleted, reverse=True):
+        sheet.delete_rows(row_idx + 2)
+    mark_changed(sheet_name)
+    return len(updates), len(deleted)
+
+def get_leave_index(company_name):
+    try:
+        key, views = load_sheet_views("근태신청")
+        # 같은 버전이라도 기간 만료로 다시 받은 프레임이면 인덱스도 새로 구성
+        return _build_leave_index(company_name, key[1], get_sheet_cache().loaded_at(key))
+    except: return LeaveIndex([])
+
+@st.cache_resource(max_entries=8)
+def _build_leave_index(company_name, version, loaded_at):
+    # 버전(및 받은 시각)별로 한 번만 구성하여 모든 세션이 같은 인덱스를 공유 (읽기 전용)
+    return LeaveIndex.from_frame(load_data("근태신청", company_name))
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("holidays")
+
+from leave import (  # noqa: E402
+    LeaveIndex, LeavePeriod, calculate_leave_usage, canonical_leave_columns, canonical_schedule_columns,
+    parse_leave, row_period,
+)
+
+# =========================================================
+# 날짜 해석
+# =========================================================
+@pytest.mark.parametrize("raw, start, end", [
+    ("2024-03-05 08:00 ~ 2024-03-07 17:00", datetime(2024, 3, 5, 8), datetime(2024, 3, 7, 17)),
+    ("2024-03-05 08:00 ~ 12:00", datetime(2024, 3, 5, 8), datetime(2024, 3, 5, 12)),
+    ("2024-03-05 ~ 2024-03-08", datetime(2024, 3, 5), datetime(2024, 3, 8, 23, 59)),
+    ("2024-03-05", datetime(2024, 3, 5), datetime(2024, 3, 5, 23, 59)),
+    (" 2024-3-5 9:30 ~ 2024-3-6 18:00 ", datetime(2024, 3, 5, 9, 30), datetime(2024, 3, 6, 18)),
+])
+def test_parse_leave_formats(raw, start, end):
+    assert parse_leave(raw) == LeavePeriod(start, end, False)
+
+@pytest.mark.parametrize("raw", [
+    "", "내일", "2024-13-01", "2024-02-30 08:00 ~ 17:00",
+    "2024-03-07 ~ 2024-03-05",   # 종료일이 시작일보다 빠름
+    "2024-03-05 17:00 ~ 08:00",  # 같은 날 종료 시각이 시작 시각보다 빠름
+])
+def test_parse_leave_rejects_invalid(raw):
+    assert parse_leave(raw) is None
+
+def test_parse_leave_half_day():
+    assert parse_leave("2024-03-05 08:00 ~ 12:00", "반차(오전)").half_day
+    assert not parse_leave("2024-03-05 08:00 ~ 12:00", "외출").half_day
+
+def test_canonical_columns():
+    assert canonical_leave_columns("2024-03-05 08:00 ~ 12:00", "반차(오전)") == ["2024-03-05 08:00", "2024-03-05 12:00", "TRUE"]
+    assert canonical_leave_columns("잘못된 값", "연차") == ["", "", ""]
+    assert canonical_schedule_columns("2024-03-05 ~ 2024-03-08") == ["2024-03-05", "2024-03-08"]
+
+def test_row_period_prefers_canonical_values():
+    period = row_period("원문이 깨짐", "연차", "2024-03-05 08:00", "2024-03-06 17:00", "FALSE")
+    assert period == LeavePeriod(datetime(2024, 3, 5, 8), datetime(2024, 3, 6, 17), False)
+    # 일정관리 구조화 열은 날짜만 있으므로 종료일은 하루 끝까지
+    assert row_period("", "", "2024-03-05", "2024-03-06").end == datetime(2024, 3, 6, 23, 59)
+    # 구조화 열이 비어 있으면 원문을 해석
+    assert row_period("2024-03-05", "반차(오후)").half_day
+
+# =========================================================
+# 사용일수 집계
+# =========================================================
+def test_usage_skips_weekends_and_holidays():
+    # 2024-03-01(금) 삼일절, 03-02/03 주말
+    usage = calculate_leave_usage(datetime(2024, 2, 29), datetime(2024, 3, 4, 23, 59), False)
+    assert usage == {"2024-02": 1.0, "2024-03": 1.0}
+
+def test_usage_half_day_counts_once():
+    assert calculate_leave_usage(datetime(2024, 3, 5, 8), datetime(2024, 3, 5, 12), True) == {"2024-03": 0.5}
+    assert calculate_leave_usage(None, None, False) == {}
+
+# =========================================================
+# 부재 인원 인덱스
+# =========================================================
+TODAY = date(2024, 3, 1)
+
+def entry(idx, start, days, status="최종승인"):
+    return (idx, f"직원{idx}", "연차", status, start, start + timedelta(days=days))
+
+def test_headcount_counts_approved_and_pending_separately():
+    index = LeaveIndex([
+        entry(0, date(2024, 3, 4), 2),
+        entry(1, date(2024, 3, 5), 0),
+        entry(2, date(2024, 3, 5), 1, "1차승인대기"),
+    ], today=TODAY)
+    assert index.headcount(date(2024, 3, 5)) == 2
+    assert index.headcount(date(2024, 3, 5), "pending") == 1
+    assert index.daily_counts(date(2024, 3, 6), date(2024, 3, 7)) == {date(2024, 3, 6): (1, 1), date(2024, 3, 7): (0, 0)}
+
+def test_far_future_typo_does_not_grow_daily_array():
+    index = LeaveIndex([entry(0, date(9999, 1, 1), 3), entry(1, date(2024, 3, 5), 0)], today=TODAY)
+    assert len(index.daily["approved"]) < 2000
+    assert index.headcount(date(2024, 3, 5)) == 1
+    assert index.headcount(date(9999, 1, 2)) == 0
+    # 일별 인원에서는 빠지지만 기간 조회에서는 그대로 찾음
+    assert [e[0] for e in index.who_is_off(date(9999, 1, 2))] == [0]
+
+def test_who_is_off_matches_linear_scan():
+    entries = [entry(n, TODAY + timedelta(days=(n * 37) % 400 - 200), (0, 1, 4, 45, 200)[n % 5]) for n in range(300)]
+    index = LeaveIndex(entries, today=TODAY)
+    for offset in range(-250, 250, 7):
+        start = TODAY + timedelta(days=offset)
+        end = start + timedelta(days=offset % 5)
+        expected = sorted(e[0] for e in entries if e[4] <= end and e[5] >= start and e[0] != 3)
+        assert sorted(e[0] for e in index.who_is_off(start, end, exclude=3)) == expected
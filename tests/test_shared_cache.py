@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from shared_cache import NullSharedCache, SQLiteSharedCache, newest_versions, open_shared_cache  # noqa: E402
+
+def test_newest_versions_picks_latest_stamp():
+    merged = newest_versions({"공지사항": "200", "일정관리": "5"}, {"공지사항": "100", "일정관리": "9", "근태신청": "1"})
+    assert merged == {"공지사항": "200", "일정관리": "9", "근태신청": "1"}
+    # 숫자가 아닌 스탬프는 먼저 들어온 값을 유지
+    assert newest_versions({"공지사항": "abc"}, {"공지사항": "300"}) == {"공지사항": "abc"}
+
+def test_open_shared_cache(tmp_path):
+    assert isinstance(open_shared_cache(""), NullSharedCache)
+    assert isinstance(open_shared_cache(f"sqlite:///{tmp_path / 'c.db'}"), SQLiteSharedCache)
+    with pytest.raises(ValueError): open_shared_cache("redis://localhost")
+
+def test_versions_only_move_forward(tmp_path):
+    cache = SQLiteSharedCache(str(tmp_path / "c.db"))
+    cache.set_version("공지사항", "200")
+    cache.set_version("공지사항", "100")
+    assert cache.get_versions() == {"공지사항": "200"}
+
+def test_frames_round_trip_without_pickle(tmp_path):
+    pytest.importorskip("pyarrow")
+    cache = SQLiteSharedCache(str(tmp_path / "c.db"))
+    df = pd.DataFrame({"소속": ["장안 제이유"], "제목": ["공지"]})
+    cache.put_frame("공지사항", "1", df)
+    cache.put_frame("공지사항", "2", df)
+    assert cache.get_frame("공지사항", "1") is None
+    pd.testing.assert_frame_equal(cache.get_frame("공지사항", "2"), df)
+    assert cache.get_frame("공지사항", "2", max_age=60) is not None
+
+def test_stale_or_unreadable_frames_are_misses(tmp_path):
+    cache = SQLiteSharedCache(str(tmp_path / "c.db"))
+    with cache._connect() as conn:
+        conn.execute("INSERT INTO frames VALUES (?, ?, ?, ?)", ("공지사항", "1", b"\x80\x04not parquet", time.time()))
+        conn.execute("INSERT INTO frames VALUES (?, ?, ?, ?)", ("일정관리", "1", b"", time.time() - 600))
+    assert cache.get_frame("공지사항", "1") is None
+    assert cache.get_frame("일정관리", "1", max_age=300) is None
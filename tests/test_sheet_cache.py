@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from sheet_cache import (  # noqa: E402
+    EMPTY_VIEW, SheetCache, company_view, load_snapshots, save_snapshot, split_by_company, to_shared_frame,
+)
+
+def frame(*companies):
+    return pd.DataFrame({"소속": list(companies), "제목": [f"제목{n}" for n in range(len(companies))]})
+
+def test_split_by_company_keeps_sheet_row_index():
+    views = split_by_company(frame("장안 제이유", "울산 제이유", "장안 제이유"))
+    assert list(company_view(views, "장안 제이유 ").index) == [0, 2]
+    assert company_view(views, "없는 회사").empty
+    assert list(views[EMPTY_VIEW].columns) == ["소속", "제목"]
+
+def test_split_without_company_column_shares_one_frame():
+    df = pd.DataFrame({"이름": ["a"]})
+    assert company_view(split_by_company(df), "장안 제이유") is df
+
+def test_to_shared_frame_leaves_non_string_columns():
+    df = to_shared_frame(pd.DataFrame({"이름": ["a"], "기간시작": pd.to_datetime(["2024-03-05"]), "기간정상": [True]}))
+    assert str(df["기간시작"].dtype).startswith("datetime64")
+    assert df["기간정상"].dtype == bool
+
+def test_get_or_load_loads_once_for_concurrent_callers():
+    cache = SheetCache(2**30)
+    calls = []
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return frame("장안 제이유")
+    threads = [threading.Thread(target=cache.get_or_load, args=(("공지사항", "1"), loader)) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(calls) == 1
+
+def test_new_version_replaces_old_and_budget_evicts_lru():
+    cache = SheetCache(2**30)
+    cache.put(("공지사항", "1"), split_by_company(frame("장안 제이유")))
+    cache.put(("공지사항", "2"), split_by_company(frame("장안 제이유")))
+    assert cache.get(("공지사항", "1")) is None and cache.get(("공지사항", "2")) is not None
+
+    cache = SheetCache(1)
+    cache.put(("공지사항", "1"), split_by_company(frame("장안 제이유")))
+    cache.put(("일정관리", "1"), split_by_company(frame("장안 제이유")))
+    assert cache.stats()["entries"] == 1
+    assert cache.get(("일정관리", "1")) is not None
+
+def test_max_age_reloads_same_version():
+    cache = SheetCache(2**30)
+    cache.put(("공지사항", "1"), split_by_company(frame("장안 제이유")), loaded_at=time.time() - 600)
+    assert cache.get(("공지사항", "1")) is not None
+    assert cache.get(("공지사항", "1"), max_age=300) is None
+    views = cache.get_or_load(("공지사항", "1"), lambda: frame("울산 제이유"), max_age=300)
+    assert not company_view(views, "울산 제이유").empty
+    assert time.time() - cache.loaded_at(("공지사항", "1")) < 5
+
+def test_snapshot_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = frame("장안 제이유", "울산 제이유")
+    save_snapshot(str(tmp_path), "공지사항", "123", df)
+    (sheet_name, version, saved, loaded), = load_snapshots(str(tmp_path), ["공지사항", "일정관리"])
+    assert (sheet_name, version) == ("공지사항", "123") and time.time() - saved < 5
+    pd.testing.assert_frame_equal(loaded, df)
+    assert not list(tmp_path.glob("*.tmp"))
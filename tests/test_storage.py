@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+pytest.importorskip("gspread")
+pytest.importorskip("holidays")
+
+import storage  # noqa: E402
+
+class ManagerSheet:
+    def __init__(self, names):
+        self.rows = [["이름", "비밀번호"]] + [[n, "pw"] for n in names]
+        self.calls = []
+
+    def row_values(self, row_no): return list(self.rows[row_no - 1]) if row_no <= len(self.rows) else []
+    def find(self, name, in_column=None):
+        rows = [n for n, r in enumerate(self.rows, 1) if r[0] == name]
+        return SimpleNamespace(row=rows[0]) if rows else None
+    def update(self, range_name=None, values=None): self.calls.append(("update", range_name))
+    def append_row(self, values): self.calls.append(("append_row", values[0]))
+    def delete_rows(self, row_no): self.calls.append(("delete_rows", row_no))
+
+class RecordingSheet:
+    def __init__(self, header=()):
+        self.header = list(header)
+        self.col_count = len(self.header)
+        self.calls = []
+
+    def row_values(self, row_no): return list(self.header)
+    def add_cols(self, cols): self.calls.append(("add_cols", cols)); self.col_count += cols
+    def update(self, range_name=None, values=None): self.calls.append(("update", range_name, values))
+    def batch_update(self, data): self.calls.append(("batch_update", data))
+    def delete_rows(self, row_no): self.calls.append(("delete_rows", row_no))
+
+@pytest.fixture
+def sheet(monkeypatch):
+    sheet = RecordingSheet(storage.REQUIRED_COLS["일정관리"])
+    monkeypatch.setattr(storage, "_checked_headers", set())
+    changed = []
+    monkeypatch.setattr(storage, "get_worksheet", lambda name: sheet)
+    monkeypatch.setattr(storage, "mark_changed", changed.append)
+    sheet.changed = changed
+    return sheet
+
+@pytest.fixture
+def managers(monkeypatch):
+    # 캐시된 인덱스는 "조장A" 가 3행이지만, 그 사이 다른 곳에서 2행이 삭제되어 시트에서는 2행
+    sheet = ManagerSheet(["조장A", "조장B"])
+    monkeypatch.setattr(storage, "get_worksheet", lambda name: sheet)
+    monkeypatch.setattr(storage, "mark_changed", lambda name: None)
+    monkeypatch.setattr(storage, "load_user_db", lambda: {"조장A": {"row": 3, "pw": "pw"}, "조장B": {"row": 4, "pw": "pw"}})
+    return sheet
+
+# =========================================================
+# 비밀번호
+# =========================================================
+def test_verify_password_hash_and_legacy_plaintext():
+    stored = storage.hash_password("비밀번호1234")
+    assert storage.verify_password(stored, "비밀번호1234") and not storage.verify_password(stored, "1234")
+    assert not storage.is_legacy_password(stored)
+    # 기존 평문 저장분: 한글이 섞여도 예외 없이 비교
+    assert storage.verify_password("조장1234", "조장1234")
+    assert not storage.verify_password("1234", "조장")
+
+def test_stale_manager_row_is_rechecked_before_writing(managers):
+    storage.upsert_manager("조장A", "새비밀번호")
+    storage.upsert_manager("조장C", "새비밀번호")
+    storage.delete_manager("조장B")
+    assert managers.calls == [("update", "A2:B2"), ("append_row", "조장C"), ("delete_rows", 3)]
+
+# =========================================================
+# 버전 스탬프
+# =========================================================
+def test_duplicate_version_rows_use_newest_stamp(monkeypatch):
+    # 첫 기록이 동시에 일어나 같은 시트 행이 둘 생긴 경우 (이후 갱신은 첫 행에만 기록됨)
+    rows = [["시트명", "버전"], ["공지사항", "300"], ["일정관리", "5"], ["공지사항", "200"]]
+    monkeypatch.setattr(storage, "get_worksheet", lambda name: SimpleNamespace(get_all_values=lambda: rows))
+    storage._load_version_sheet.clear()
+    try: assert storage._load_version_sheet() == {"공지사항": "300", "일정관리": "5"}
+    finally: storage._load_version_sheet.clear()
+
+# =========================================================
+# 일괄 수정
+# =========================================================
+def schedule_frame(rows):
+    return pd.DataFrame(rows, columns=["날짜", "제목", "내용"], index=range(len(rows)))
+
+def test_apply_sheet_edits_writes_only_changed_cells(sheet):
+    original = schedule_frame([["2024-03-05", "회의", ""], ["2024-03-06", "점검", "A"]])
+    edited = original.copy()
+    edited.loc[1, "내용"] = "B"
+    assert storage.apply_sheet_edits("일정관리", original, edited) == (1, 0)
+    assert sheet.calls == [("batch_update", [{"range": "D3", "values": [["B"]]}])]
+    assert sheet.changed == ["일정관리"]
+
+def test_apply_sheet_edits_extends_header_before_writing(sheet):
+    # 구조화 열이 생기기 전의 시트: 헤더를 먼저 보완해야 시작일/종료일 열 기록이 시트 범위 안에 들어감
+    sheet.header = sheet.header[:5]
+    sheet.col_count = 5
+    original = schedule_frame([["2024-03-05", "회의", ""]])
+    edited = original.copy()
+    edited.loc[0, "날짜"] = "2024-03-07"
+    storage.apply_sheet_edits("일정관리", original, edited)
+    assert [c[0] for c in sheet.calls] == ["add_cols", "update", "batch_update"]
+
+def test_apply_sheet_edits_deletes_bottom_up_and_skips_deleted_rows(sheet):
+    original = schedule_frame([["2024-03-05", "a", ""], ["2024-03-06", "b", ""], ["2024-03-07", "c", ""]])
+    edited = original.copy()
+    edited.loc[0, "제목"] = "바뀜"
+    assert storage.apply_sheet_edits("일정관리", original, edited, deleted=[0, 2]) == (0, 2)
+    assert sheet.calls == [("delete_rows", 4), ("delete_rows", 2)]
+
+def test_apply_sheet_edits_without_changes_does_nothing(sheet):
+    original = schedule_frame([["2024-03-05", "a", ""]])
+    assert storage.apply_sheet_edits("일정관리", original, original.copy()) == (0, 0)
+    assert sheet.calls == [] and sheet.changed == []
+
+def test_apply_sheet_edits_refreshes_canonical_columns(sheet):
+    original = schedule_frame([["2024-03-05", "회의", ""]])
+    edited = original.copy()
+    edited.loc[0, "날짜"] = "2024-03-07 ~ 2024-03-08"
+    storage.apply_sheet_edits("일정관리", original, edited)
+    (_, updates), = sheet.calls
+    assert {u["range"]: u["values"][0][0] for u in updates} == {"B2": "2024-03-07 ~ 2024-03-08", "F2": "2024-03-07", "G2": "2024-03-08"}
+
+# =========================================================
+# 열 구성
+# =========================================================
+def test_ensure_columns_extends_short_header(monkeypatch):
+    monkeypatch.setattr(storage, "_checked_headers", set())
+    sheet = RecordingSheet(storage.REQUIRED_COLS["공지사항"][:6])
+    storage.ensure_columns(sheet, "공지사항")
+    storage.ensure_columns(sheet, "공지사항")
+    assert sheet.calls == [("add_cols", 1), ("update", "A1", [storage.REQUIRED_COLS["공지사항"]])]
+
+def test_period_columns_on_frames_cached_before_canonical_columns():
+    # 구조화 열이 생기기 전에 저장된 스냅샷/공유 캐시 프레임
+    old = pd.DataFrame({"소속": ["장안 제이유"] * 2, "구분": ["연차", "반차(오전)"],
+                        "날짜및시간": ["2024-03-05 ~ 2024-03-06", "2024-03-07 17:00 ~ 08:00"], "상태": ["최종승인", "1차승인대기"]})
+    df = storage.add_period_columns("근태신청", storage.normalize_columns("근태신청", old))
+    assert list(df.columns[:len(old.columns)]) == list(old.columns)
+    assert set(storage.REQUIRED_COLS["근태신청"]) <= set(df.columns)
+    assert list(df["기간정상"]) == [True, False]
+    assert df.loc[0, "기간종료"] == pd.Timestamp("2024-03-06 23:59")